@@ -0,0 +1,171 @@
+"""
+ElectroWizard - Cluster Assignment Module
+Persists the K-Means centroids together with the scaler they were fitted in
+and assigns zones to clusters with a vectorized nearest-centroid search
+"""
+
+import copy
+import numpy as np
+
+
+class ClusterAssigner:
+    """Nearest-centroid assignment in the K-Means training feature space"""
+
+    def __init__(self, centroids, mean, scale, feature_names, counts=None):
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        # Rows absorbed per centroid; weights the mini-batch updates in partial_fit()
+        self.counts = None if counts is None else np.asarray(counts, dtype=np.float64)
+        self._centroid_norms = (self.centroids ** 2).sum(axis=1)
+
+    @classmethod
+    def from_kmeans(cls, kmeans_model, scaler, feature_names, counts=None):
+        """Pair a fitted KMeans with the StandardScaler used to train it"""
+        return cls(kmeans_model.cluster_centers_, scaler.mean_, scaler.scale_, feature_names, counts)
+
+    @classmethod
+    def fit_scaler(cls, kmeans_model, cluster_features):
+        """Refit the training scaler on the raw cluster features (DataFrame)"""
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler().fit(cluster_features)
+        counts = np.bincount(kmeans_model.labels_, minlength=len(kmeans_model.cluster_centers_))
+        return cls.from_kmeans(kmeans_model, scaler, list(cluster_features.columns), counts)
+
+    @property
+    def n_clusters(self):
+        return len(self.centroids)
+
+    def transform(self, X):
+        """Scale raw cluster features into the centroid space"""
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+    def assign(self, X, chunk_size=1_000_000):
+        """Cluster id for each row of raw cluster features, shape (n_rows,)"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        clusters = np.empty(len(X), dtype=np.int32)
+
+        # argmin ||x - c||^2 == argmin (||c||^2 - 2 x.c); chunking bounds the temporaries
+        for start in range(0, len(X), chunk_size):
+            X_scaled = self.transform(X[start:start + chunk_size])
+            distances = self._centroid_norms - 2.0 * (X_scaled @ self.centroids.T)
+            clusters[start:start + chunk_size] = np.argmin(distances, axis=1)
+
+        return clusters
+
+    def partial_fit(self, X):
+        """Mini-batch K-Means step on new raw rows, returned as a new assigner
+
+        Each centroid moves to the running mean of every row it has absorbed,
+        as in MiniBatchKMeans. The scaler is kept fixed so existing assignments
+        stay comparable. Assigners pickled before counts were tracked weight
+        each centroid as if it had seen as many rows as this batch.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        counts = getattr(self, 'counts', None)
+        if counts is None:
+            counts = np.full(self.n_clusters, float(len(X)))
+
+        clusters = self.assign(X)
+        X_scaled = self.transform(X)
+        batch_counts = np.bincount(clusters, minlength=self.n_clusters).astype(np.float64)
+        batch_sums = np.zeros_like(self.centroids)
+        np.add.at(batch_sums, clusters, X_scaled)
+
+        new_counts = counts + batch_counts
+        touched = batch_counts > 0
+        centroids = self.centroids.copy()
+        centroids[touched] = (
+            (self.centroids[touched] * counts[touched, None] + batch_sums[touched]) / new_counts[touched, None]
+        )
+        return ClusterAssigner(centroids, self.mean, self.scale, self.feature_names, new_counts)
+
+    def centroids_original_units(self):
+        """Centroids mapped back to the raw feature scale, one dict per cluster"""
+        centroids = self.centroids * self.scale + self.mean
+        return [dict(zip(self.feature_names, centroid.tolist())) for centroid in centroids]
+
+
+class ClusterIndex:
+    """cluster -> row positions index so per-cluster lookups cost O(result)
+
+    Rows that change cluster after the build are kept in a small overlay
+    (moved positions and their new clusters) instead of re-sorting every
+    row. updated() returns a new index and leaves this one untouched, so
+    readers holding it are never affected. The overlay is folded back into
+    the CSR layout once it grows past COMPACT_FRACTION of the rows.
+    """
+
+    COMPACT_MIN_ROWS = 4096
+    COMPACT_FRACTION = 1 / 32
+
+    def __init__(self, clusters, n_clusters=None):
+        clusters = np.array(clusters, dtype=np.int64)
+        n_clusters = n_clusters or (int(clusters.max()) + 1 if len(clusters) else 0)
+
+        # CSR layout: positions sorted by cluster, offsets[k]:offsets[k + 1] per cluster
+        self._order = np.argsort(clusters, kind='stable')
+        counts = np.bincount(clusters, minlength=n_clusters)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.n_clusters = n_clusters
+
+        self._clusters = clusters  # cluster of each row at build time
+        self._moved = np.zeros(0, dtype=np.int64)  # positions whose cluster changed since, ascending
+        self._moved_to = np.zeros(0, dtype=np.int64)
+        self._moved_from = np.zeros(0, dtype=np.int64)
+
+    def updated(self, positions, clusters):
+        """A new index with the rows at positions moved to clusters"""
+        positions = np.asarray(positions, dtype=np.int64)
+        clusters = np.asarray(clusters, dtype=np.int64)
+
+        # Merge with the overlay; the latest cluster of a row wins
+        merged = np.concatenate([self._moved, positions])[::-1]
+        merged_to = np.concatenate([self._moved_to, clusters])[::-1]
+        moved, last = np.unique(merged, return_index=True)
+        moved_to = merged_to[last]
+        changed = moved_to != self._clusters[moved]
+        moved, moved_to = moved[changed], moved_to[changed]
+
+        out_of_range = len(moved_to) and (moved_to.min() < 0 or moved_to.max() >= self.n_clusters)
+        if out_of_range or len(moved) > max(self.COMPACT_MIN_ROWS, len(self._clusters) * self.COMPACT_FRACTION):
+            clusters_now = self._clusters.copy()
+            clusters_now[moved] = moved_to
+            n_clusters = max(self.n_clusters, int(moved_to.max()) + 1) if len(moved_to) else self.n_clusters
+            return ClusterIndex(clusters_now, n_clusters)
+
+        index = copy.copy(self)
+        index._moved, index._moved_to, index._moved_from = moved, moved_to, self._clusters[moved]
+        return index
+
+    def positions(self, cluster):
+        """Row positions belonging to a cluster, ascending (empty for unknown ids)"""
+        if cluster < 0 or cluster >= self.n_clusters:
+            return self._order[:0]
+        positions = self._order[self._offsets[cluster]:self._offsets[cluster + 1]]
+        if not len(self._moved):
+            return positions
+
+        leaving = self._moved[self._moved_from == cluster]
+        arriving = self._moved[self._moved_to == cluster]
+        if len(leaving):
+            positions = positions[~np.isin(positions, leaving, assume_unique=True)]
+        if len(arriving):
+            positions = np.sort(np.concatenate([positions, arriving]))
+        return positions
+
+    def size(self, cluster):
+        if cluster < 0 or cluster >= self.n_clusters:
+            return 0
+        return int(
+            self._offsets[cluster + 1] - self._offsets[cluster]
+            - np.count_nonzero(self._moved_from == cluster) + np.count_nonzero(self._moved_to == cluster)
+        )
+
+    def sizes(self):
+        return {k: self.size(k) for k in range(self.n_clusters)}
+
+    def overlay_rows(self):
+        return len(self._moved)
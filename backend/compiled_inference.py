@@ -0,0 +1,297 @@
+"""
+ElectroWizard - Compiled Inference Module
+Flattens the XGBoost and Random Forest models into NumPy node arrays
+for low-latency single-row scoring without pandas or per-call model overhead
+"""
+
+import json
+import time
+import numpy as np
+
+
+class FlatTreeEnsemble:
+    """Tree ensemble stored as flat feature/threshold/left/right/value arrays
+
+    All trees share one set of node arrays; `roots` holds the offset of each
+    tree's root node. Leaves point to themselves, so walking every tree for
+    `max_depth` steps always ends on a leaf.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth,
+                 default_left=None, inclusive=False):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.default_left = default_left
+        # XGBoost goes left on x < threshold, scikit-learn on x <= threshold
+        self.inclusive = inclusive
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def leaf_indices(self, X):
+        """Return the leaf node reached in every tree, shape (n_rows, n_trees)"""
+        X = np.atleast_2d(X)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        has_missing = self.default_left is not None and np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            values = X[rows, self.feature[node]]
+            if self.inclusive:
+                go_left = values <= self.threshold[node]
+            else:
+                go_left = values < self.threshold[node]
+            if has_missing:
+                go_left = np.where(np.isnan(values), self.default_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return node
+
+    @classmethod
+    def from_xgboost(cls, booster):
+        """Flatten an xgboost Booster (gbtree, numerical splits only)"""
+        model = json.loads(booster.save_raw(raw_format='json'))
+        trees = model['learner']['gradient_booster']['model']['trees']
+
+        features, thresholds, lefts, rights, values, default_lefts, roots = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for tree in trees:
+            left = np.asarray(tree['left_children'], dtype=np.int32)
+            right = np.asarray(tree['right_children'], dtype=np.int32)
+            is_leaf = left == -1
+            node_ids = np.arange(len(left), dtype=np.int32)
+
+            # Leaf values are stored in split_conditions for leaf nodes
+            split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            features.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, split_conditions).astype(np.float32))
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, right) + offset)
+            values.append(np.where(is_leaf, split_conditions, 0.0).astype(np.float32))
+            default_lefts.append(np.asarray(tree['default_left'], dtype=bool))
+            roots.append(offset)
+
+            max_depth = max(max_depth, _tree_depth(left, right))
+            offset += len(left)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            default_left=np.concatenate(default_lefts),
+            inclusive=False
+        )
+
+    @classmethod
+    def from_sklearn_forest(cls, forest):
+        """Flatten a fitted scikit-learn RandomForestClassifier"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            left = tree.children_left.astype(np.int32)
+            right = tree.children_right.astype(np.int32)
+            is_leaf = left == -1
+            node_ids = np.arange(tree.node_count, dtype=np.int32)
+
+            # Normalise leaf class counts to per-tree probabilities
+            leaf_value = tree.value[:, 0, :].astype(np.float64)
+            leaf_value = leaf_value / leaf_value.sum(axis=1, keepdims=True)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, right) + offset)
+            values.append(leaf_value)
+            roots.append(offset)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += tree.node_count
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            inclusive=True
+        )
+
+
+def _tree_depth(left, right):
+    """Depth of a tree given its child arrays (root at index 0)"""
+    depth = 0
+    level = np.array([0])
+    while True:
+        level = level[left[level] != -1]
+        if len(level) == 0:
+            return depth
+        level = np.concatenate([left[level], right[level]])
+        depth += 1
+
+
+def _parse_base_score(booster):
+    """Read the global bias from the booster config ('7.7E1' or '[7.7E1]')"""
+    config = json.loads(booster.save_config())
+    base_score = config['learner']['learner_model_param']['base_score']
+    return float(base_score.strip('[]').split(',')[0])
+
+
+class CompiledPredictor:
+    """Single-row predictor that evaluates flattened trees from a float vector"""
+
+    def __init__(self, feature_cols, xgb_trees, xgb_base_score, rf_trees, rf_classes,
+                 scaler_mean, scaler_scale, cluster_idx, assign_clusters):
+        self.feature_cols = list(feature_cols)
+        self.xgb_trees = xgb_trees
+        self.xgb_base_score = np.float32(xgb_base_score)
+        self.rf_trees = rf_trees
+        self.rf_classes = np.asarray(rf_classes)
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.cluster_idx = np.asarray(cluster_idx)
+        self.assign_clusters = assign_clusters
+        self.risk_levels = ['Low', 'Medium', 'High', 'Critical']
+
+    @classmethod
+    def from_predictor(cls, predictor):
+        """Compile the models currently loaded on a PowerOutagePredictor"""
+        feature_cols = predictor.feature_cols
+        return cls(
+            feature_cols=feature_cols,
+            xgb_trees=FlatTreeEnsemble.from_xgboost(predictor.xgb_model.get_booster()),
+            xgb_base_score=_parse_base_score(predictor.xgb_model.get_booster()),
+            rf_trees=FlatTreeEnsemble.from_sklearn_forest(predictor.rf_classifier),
+            rf_classes=predictor.rf_classifier.classes_,
+            scaler_mean=predictor.scaler.mean_,
+            scaler_scale=predictor.scaler.scale_,
+            cluster_idx=[feature_cols.index(col) for col in predictor.CLUSTER_FEATURES],
+            assign_clusters=predictor.assign_clusters
+        )
+
+    def vectorize(self, features_dict):
+        """Build the float64 feature vector in model column order"""
+        return np.fromiter(
+            (features_dict[col] for col in self.feature_cols),
+            dtype=np.float64,
+            count=len(self.feature_cols)
+        )
+
+    def predict_matrix(self, X):
+        """Score a (n_rows, n_features) float matrix; returns column arrays"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+
+        # XGBoost works in float32: bias plus one leaf value per tree
+        xgb_leaves = self.xgb_trees.leaf_indices(X.astype(np.float32))
+        impact_scores = self.xgb_trees.value[xgb_leaves].sum(axis=1, dtype=np.float32) + self.xgb_base_score
+
+        # Random Forest averages per-tree class probabilities on scaled float32 input
+        X_scaled = ((X - self.scaler_mean) / self.scaler_scale).astype(np.float32)
+        rf_leaves = self.rf_trees.leaf_indices(X_scaled)
+        risk_proba = self.rf_trees.value[rf_leaves].mean(axis=1)
+        risk_class = self.rf_classes[np.argmax(risk_proba, axis=1)].astype(int)
+
+        # Nearest centroid
+        clusters = self.assign_clusters(X[:, self.cluster_idx])
+
+        return {
+            'impact_score': impact_scores.astype(np.float64),
+            'risk_class': risk_class,
+            'risk_proba': risk_proba,
+            'cluster': clusters
+        }
+
+    def predict_impact(self, features_dict):
+        """Predict impact score for a single zone (same output as the native path)"""
+        result = self.predict_matrix(self.vectorize(features_dict))
+        risk_proba = result['risk_proba'][0]
+
+        return {
+            'impact_score': float(result['impact_score'][0]),
+            'risk_level': self.risk_levels[result['risk_class'][0]],
+            'risk_probabilities': {
+                level: float(proba) for level, proba in zip(self.risk_levels, risk_proba)
+            },
+            'cluster': int(result['cluster'][0])
+        }
+
+
+def check_parity(predictor, compiled, X):
+    """Compare compiled scores against the native models over a feature DataFrame"""
+    native = predictor.predict_arrays(X)
+    compiled_result = compiled.predict_matrix(X[predictor.feature_cols].to_numpy(dtype=np.float64))
+
+    return {
+        'rows': len(X),
+        'max_impact_diff': float(np.max(np.abs(native['impact_score'] - compiled_result['impact_score']))),
+        'max_proba_diff': float(np.max(np.abs(native['risk_proba'] - compiled_result['risk_proba']))),
+        'risk_agreement': float(np.mean(native['risk_class'] == compiled_result['risk_class'])),
+        'cluster_agreement': float(np.mean(native['cluster'] == compiled_result['cluster']))
+    }
+
+
+def benchmark_latency(predict_fn, rows, repeats=5):
+    """Time single-row predict calls; returns p50/p99/mean in milliseconds"""
+    latencies = []
+    for _ in range(repeats):
+        for row in rows:
+            start = time.perf_counter()
+            predict_fn(row)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies = np.asarray(latencies)
+    return {
+        'calls': len(latencies),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean())
+    }
+
+
+def main():
+    """Check compiled-vs-native parity and benchmark single-row latency"""
+    import pandas as pd
+    from ml_models import PowerOutagePredictor
+
+    predictor = PowerOutagePredictor()
+    df = predictor.load_data()
+    predictor.load_models()
+    predictor.ensure_cluster_assigner(df)
+    compiled = CompiledPredictor.from_predictor(predictor)
+    print(f"🌲 Compiled {compiled.xgb_trees.n_trees} XGBoost trees ({compiled.xgb_trees.n_nodes} nodes) "
+          f"and {compiled.rf_trees.n_trees} Random Forest trees ({compiled.rf_trees.n_nodes} nodes)")
+
+    print("\n🔍 Parity against native models:")
+    for key, value in check_parity(predictor, compiled, df).items():
+        print(f"   {key}: {value}")
+
+    rows = df[predictor.feature_cols].head(200).to_dict('records')
+    print("\n⏱️ Single-row latency:")
+    for name, predict_fn in [('native', predictor.predict_impact), ('compiled', compiled.predict_impact)]:
+        report = benchmark_latency(predict_fn, rows)
+        print(f"   {name:>8}: p50 {report['p50_ms']:.3f} ms | p99 {report['p99_ms']:.3f} ms "
+              f"| mean {report['mean_ms']:.3f} ms over {report['calls']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+ElectroWizard - Outage Event Stream Module
+Synthetic feeder telemetry: time-stamped outage start/update/restore events
+per zone from the CHENNAI_DISTRICTS profiles, plus a replay driver that
+pushes them to POST /api/events at 1x-1000x real time
+"""
+
+import json
+import os
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+from dataset_generator import (
+    CHENNAI_DISTRICTS, DURATION_HOURS, DURATION_PROBS, PEAK_HOURS, WEATHER_OPTIONS, WEATHER_PROBS
+)
+
+EVENT_TYPES = ('outage_start', 'outage_update', 'outage_restore')
+
+# Outage frequency relative to the base rate, by district critical level
+CRITICAL_LEVEL_RATE = {'high': 1.5, 'medium': 1.0, 'low': 0.6}
+
+
+def generate_events(zones, hours=24.0, outages_per_zone_day=0.5, update_interval_minutes=15.0,
+                    seed=42, start_time=None):
+    """Event log for `zones` (zone_id, district, load_demand_kw) over a time window
+
+    Outages arrive per zone as a Poisson process scaled by the district's
+    critical level. Each emits a start event, an update every
+    update_interval_minutes with a revised duration estimate and load
+    reading, and a restore event. Events after the window are dropped, so
+    outages can still be open at the end. Returns a DataFrame sorted by time.
+    """
+    rng = np.random.default_rng(seed)
+    start_ts = (start_time or datetime(2024, 1, 1, tzinfo=timezone.utc)).timestamp()
+    window_s = hours * 3600
+
+    zones = zones.reset_index(drop=True)
+    rate_multiplier = zones['district'].map(
+        lambda district: CRITICAL_LEVEL_RATE[CHENNAI_DISTRICTS[district]['critical_level']]
+        if district in CHENNAI_DISTRICTS else 1.0
+    ).to_numpy(dtype=np.float64)
+
+    # One row per outage
+    outage_counts = rng.poisson(outages_per_zone_day * hours / 24 * rate_multiplier)
+    zone_idx = np.repeat(np.arange(len(zones)), outage_counts)
+    n_outages = len(zone_idx)
+    started = start_ts + rng.uniform(0, window_s, n_outages)
+    duration_h = rng.choice(DURATION_HOURS, size=n_outages, p=DURATION_PROBS).astype(np.float64)
+    weather = np.array(WEATHER_OPTIONS, dtype=object)[rng.choice(len(WEATHER_OPTIONS), size=n_outages, p=WEATHER_PROBS)]
+    base_load = zones['load_demand_kw'].to_numpy(dtype=np.float64)[zone_idx]
+
+    outages = pd.DataFrame({
+        'outage_id': np.arange(n_outages),
+        'zone_id': zones['zone_id'].to_numpy()[zone_idx],
+        'district': zones['district'].to_numpy()[zone_idx],
+        'weather_condition': weather,
+        'started': started,
+        'duration_h': duration_h,
+        'base_load': base_load
+    })
+
+    # Updates at fixed intervals while the outage lasts
+    interval_s = update_interval_minutes * 60
+    n_updates = np.floor(duration_h * 3600 / interval_s - 1e-9).astype(np.int64).clip(min=0)
+    update_outage = np.repeat(np.arange(n_outages), n_updates)
+    update_step = np.arange(len(update_outage)) - np.repeat(np.cumsum(n_updates) - n_updates, n_updates) + 1
+    elapsed_h = update_step * interval_s / 3600
+    true_h = duration_h[update_outage]
+    # The estimate converges on the true duration as the outage goes on
+    noise = rng.normal(0, 0.3, len(update_outage)) * (1 - elapsed_h / true_h)
+    estimate_h = np.maximum(elapsed_h, true_h * (1 + noise))
+
+    def frame(outage_rows, event_type, ts, duration, load_factor):
+        rows = outages.iloc[outage_rows]
+        return pd.DataFrame({
+            'ts': ts,
+            'zone_id': rows['zone_id'].to_numpy(),
+            'district': rows['district'].to_numpy(),
+            'event_type': event_type,
+            'outage_id': rows['outage_id'].to_numpy(),
+            'outage_duration_hours': np.round(duration, 2),
+            'weather_condition': rows['weather_condition'].to_numpy(),
+            'load_demand_kw': np.round(rows['base_load'].to_numpy() * load_factor, 2)
+        })
+
+    all_outages = np.arange(n_outages)
+    # Start events carry the dispatcher's first (noisy) duration estimate
+    first_estimate = np.maximum(0.25, duration_h * (1 + rng.normal(0, 0.3, n_outages)))
+    events = pd.concat([
+        frame(all_outages, 'outage_start', started, first_estimate, rng.uniform(0.9, 1.1, n_outages)),
+        frame(update_outage, 'outage_update', started[update_outage] + update_step * interval_s, estimate_h,
+              rng.uniform(0.8, 1.2, len(update_outage))),
+        frame(all_outages, 'outage_restore', started + duration_h * 3600, duration_h, np.ones(n_outages))
+    ], ignore_index=True)
+
+    events = events[events['ts'] < start_ts + window_s].sort_values('ts', kind='stable').reset_index(drop=True)
+
+    hours_of_day = pd.to_datetime(events['ts'], unit='s', utc=True).dt.hour.to_numpy()
+    events['outage_hour'] = hours_of_day
+    events['is_peak_hour'] = np.isin(hours_of_day, PEAK_HOURS).astype(np.int64)
+    events['timestamp'] = pd.to_datetime(events['ts'], unit='s', utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    events.insert(0, 'event_id', np.arange(len(events)))
+    return events
+
+
+def write_events(events, path):
+    """Write an event log as NDJSON (one event per line)"""
+    events.to_json(path, orient='records', lines=True)
+
+
+def read_events(path):
+    return pd.read_json(path, orient='records', lines=True, convert_dates=False)
+
+
+def _post_json(url, payload, timeout):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}, method='POST'
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def replay(events, base_url='http://localhost:8000', speed=1.0, batch_size=500, timeout=30.0):
+    """Push events to POST /api/events following their timestamps
+
+    speed=60 plays an hour of telemetry per minute; speed=0 sends as fast as
+    the backend accepts. Events that are due together are sent as one batch
+    (up to batch_size) and always in log order, so a zone's start, updates
+    and restore arrive in sequence. Returns a summary with the achieved rate
+    and request latencies.
+    """
+    url = f"{base_url.rstrip('/')}/api/events"
+    records = events.drop(columns=['ts']).to_dict('records')
+    offsets = events['ts'].to_numpy() - (events['ts'].iloc[0] if len(events) else 0.0)
+
+    latencies = []
+    errors = 0
+    sent = 0
+    wall_start = time.perf_counter()
+
+    while sent < len(records):
+        elapsed = time.perf_counter() - wall_start
+        if speed > 0:
+            due = int(np.searchsorted(offsets, elapsed * speed, side='right'))
+            if due <= sent:
+                time.sleep(min(0.5, (offsets[sent] / speed) - elapsed))
+                continue
+        else:
+            due = len(records)
+
+        batch = records[sent:min(due, sent + batch_size)]
+        request_start = time.perf_counter()
+        try:
+            _post_json(url, batch, timeout)
+        except Exception as e:
+            errors += 1
+            print(f"⚠️ Batch at event {sent} failed: {e}")
+        latencies.append((time.perf_counter() - request_start) * 1000)
+        sent += len(batch)
+
+    wall_s = time.perf_counter() - wall_start
+    requests = len(latencies)
+    latencies = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        'events': sent,
+        'requests': requests,
+        'errors': errors,
+        'speed': speed,
+        'wall_s': wall_s,
+        'events_per_s': sent / wall_s if wall_s else 0.0,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies, 50)),
+            'p99': float(np.percentile(latencies, 99)),
+            'max': float(latencies.max())
+        }
+    }
+
+
+def main():
+    """python event_stream.py generate OUT.ndjson [HOURS] | replay IN.ndjson [SPEED]"""
+    if len(sys.argv) < 3 or sys.argv[1] not in ('generate', 'replay'):
+        print(main.__doc__)
+        return
+
+    command, path = sys.argv[1], sys.argv[2]
+    if command == 'generate':
+        hours = float(sys.argv[3]) if len(sys.argv) > 3 else 24.0
+        zones = pd.read_csv(os.getenv('EVENT_ZONES_PATH', 'chennai_power_outage_data.csv'),
+                            usecols=['zone_id', 'district', 'load_demand_kw'])
+        events = generate_events(
+            zones, hours=hours,
+            outages_per_zone_day=float(os.getenv('EVENT_OUTAGES_PER_ZONE_DAY', '0.5')),
+            update_interval_minutes=float(os.getenv('EVENT_UPDATE_INTERVAL_MINUTES', '15')),
+            seed=int(os.getenv('EVENT_SEED', '42'))
+        )
+        write_events(events, path)
+        print(f"📡 {len(events):,} events for {len(zones):,} zones over {hours:g}h written to {path}")
+        print(events['event_type'].value_counts().to_string())
+    else:
+        speed = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+        events = read_events(path)
+        print(f"▶️ Replaying {len(events):,} events at {speed:g}x to {os.getenv('EVENT_STREAM_URL', 'http://localhost:8000')}")
+        summary = replay(
+            events,
+            base_url=os.getenv('EVENT_STREAM_URL', 'http://localhost:8000'),
+            speed=speed,
+            batch_size=int(os.getenv('EVENT_BATCH_SIZE', '500'))
+        )
+        print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
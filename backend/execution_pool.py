@@ -0,0 +1,78 @@
+"""
+ElectroWizard - Execution Pool Module
+Runs CPU-bound request work off the event loop: a thread pool for
+GIL-releasing numpy/xgboost/pandas work and a process pool for pure Python
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+class ExecutionPool:
+    """Pluggable execution layer shared by the API routes
+
+    `thread_workers` defaults to min(32, cpu_count + 4) like the standard
+    library. With `process_workers=0` (the default) process work falls back
+    to the thread pool, so single-core or constrained replicas need no extra
+    processes.
+    """
+
+    def __init__(self, thread_workers=None, process_workers=None):
+        cpu_count = os.cpu_count() or 1
+        self.thread_workers = thread_workers or _env_int('EXECUTOR_THREAD_WORKERS', min(32, cpu_count + 4))
+        self.process_workers = (
+            process_workers if process_workers is not None
+            else _env_int('EXECUTOR_PROCESS_WORKERS', 0)
+        )
+        self._thread_executor = None
+        self._process_executor = None
+
+    @property
+    def thread_executor(self):
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=self.thread_workers,
+                thread_name_prefix='electrowizard'
+            )
+        return self._thread_executor
+
+    @property
+    def process_executor(self):
+        if self.process_workers <= 0:
+            return self.thread_executor
+        if self._process_executor is None:
+            self._process_executor = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process_executor
+
+    async def run_in_thread(self, fn, *args, **kwargs):
+        """Run fn on the thread pool (numpy, pandas, xgboost, sklearn inference)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.thread_executor, functools.partial(fn, *args, **kwargs))
+
+    async def run_in_process(self, fn, *args, **kwargs):
+        """Run a picklable fn on the process pool (pure-Python loops)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.process_executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        """Stop both pools; they are recreated lazily on next use"""
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=wait)
+            self._thread_executor = None
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=wait)
+            self._process_executor = None
+
+    def stats(self):
+        return {
+            'thread_workers': self.thread_workers,
+            'process_workers': self.process_workers,
+            'process_pool_active': self._process_executor is not None
+        }
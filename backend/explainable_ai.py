@@ -3,7 +3,6 @@ ElectroWizard - Explainable AI Module
 Uses SHAP for model interpretability
 """
 
-import shap
 import numpy as np
 import pandas as pd
 
@@ -17,6 +16,8 @@ class ExplainableAI:
         
     def create_explainer(self, X_background):
         """Create SHAP explainer with background data"""
+        import shap  # heavy import, only needed once an explainer is built
+        
         print("🔍 Creating SHAP explainer...")
         # Use TreeExplainer for XGBoost (faster and exact)
         self.explainer = shap.TreeExplainer(self.model)
@@ -0,0 +1,141 @@
+"""
+ElectroWizard - Geo Tiles Module
+Per-zoom aggregates of zones binned into Web Mercator tiles (the map's own
+tiling), so a city-wide risk map draws a few hundred cells instead of
+every zone
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+
+MIN_ZOOM = 8
+MAX_ZOOM = 18
+RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+
+# Web Mercator's latitude limit
+MAX_LATITUDE = 85.05112878
+
+
+def tile_xy(lat, lon, zoom):
+    """Tile column/row of each point at a zoom level (slippy-map numbering)"""
+    n = 2 ** zoom
+    lat_rad = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    x = np.floor((lon + 180.0) / 360.0 * n).astype(np.int64).clip(0, n - 1)
+    y = np.floor((1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0 * n).astype(np.int64).clip(0, n - 1)
+    return x, y
+
+
+def tile_bounds(x, y, zoom):
+    """(south, west, north, east) of tiles"""
+    n = 2 ** zoom
+
+    def latitude(row):
+        return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * row / n))))
+
+    return latitude(y + 1), x / n * 360.0 - 180.0, latitude(y), (x + 1) / n * 360.0 - 180.0
+
+
+def _reduce(keys, sums, maxima):
+    """Group rows by key: summed columns add up, max columns keep the max"""
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1]) if len(keys) else np.zeros(0, dtype=np.int64)
+    reduced_sums = {name: np.add.reduceat(values[order], starts, axis=0) for name, values in sums.items()}
+    reduced_max = {name: np.maximum.reduceat(values[order], starts) for name, values in maxima.items()}
+    return keys[starts], reduced_sums, reduced_max
+
+
+class TilePyramid:
+    """Cell aggregates for every zoom level from MIN_ZOOM to MAX_ZOOM
+
+    The finest level is grouped from the zones once; each coarser level is
+    rolled up from the one below (a tile's parent is x >> 1, y >> 1), so the
+    whole pyramid costs one sort of the zones plus work on cells.
+    """
+
+    def __init__(self, latitudes, longitudes, impact, risk_levels, hospitals,
+                 min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+        latitudes, longitudes = latitudes[valid], longitudes[valid]
+
+        risk_codes = pd.Categorical(risk_levels, categories=RISK_LEVELS).codes[valid]
+        risk_counts = np.zeros((len(risk_codes), len(RISK_LEVELS)), dtype=np.int64)
+        known = risk_codes >= 0
+        risk_counts[np.flatnonzero(known), risk_codes[known]] = 1
+
+        x, y = tile_xy(latitudes, longitudes, max_zoom)
+        keys, sums, maxima = _reduce(
+            (x << max_zoom) | y,
+            {
+                'count': np.ones(len(x), dtype=np.int64),
+                'impact_sum': np.asarray(impact, dtype=np.float64)[valid],
+                'lat_sum': latitudes,
+                'lon_sum': longitudes,
+                'hospitals': np.asarray(hospitals, dtype=np.int64)[valid],
+                'risk_counts': risk_counts
+            },
+            {'impact_max': np.asarray(impact, dtype=np.float64)[valid]}
+        )
+
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.zones = int(valid.sum())
+        self.levels = {}
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            self.levels[zoom] = {'x': keys >> zoom, 'y': keys & ((1 << zoom) - 1), **sums, **maxima}
+            if zoom > min_zoom:
+                parent_keys = ((keys >> zoom) >> 1 << (zoom - 1)) | ((keys & ((1 << zoom) - 1)) >> 1)
+                keys, sums, maxima = _reduce(parent_keys, sums, maxima)
+
+    def cells(self, zoom, bbox=None):
+        """Cell records at a zoom level, optionally only tiles touching bbox"""
+        level = self.levels[zoom]
+        selected = np.arange(len(level['x']))
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            (x_lo, x_hi), (y_hi, y_lo) = tile_xy(np.array([min_lat, max_lat]), np.array([min_lon, max_lon]), zoom)
+            selected = np.flatnonzero(
+                (level['x'] >= x_lo) & (level['x'] <= x_hi) & (level['y'] >= y_lo) & (level['y'] <= y_hi)
+            )
+
+        x, y = level['x'][selected], level['y'][selected]
+        south, west, north, east = tile_bounds(x, y, zoom)
+        count = level['count'][selected]
+        risk_counts = level['risk_counts'][selected]
+        return [
+            {
+                'x': int(x[i]),
+                'y': int(y[i]),
+                'bounds': [float(south[i]), float(west[i]), float(north[i]), float(east[i])],
+                'center': [float(level['lat_sum'][j] / count[i]), float(level['lon_sum'][j] / count[i])],
+                'count': int(count[i]),
+                'mean_impact': float(level['impact_sum'][j] / count[i]),
+                'max_impact': float(level['impact_max'][j]),
+                'risk_histogram': dict(zip(RISK_LEVELS, risk_counts[i].tolist())),
+                'hospitals': int(level['hospitals'][j])
+            }
+            for i, j in enumerate(selected)
+        ]
+
+
+class TilePyramidCache:
+    """One pyramid per impact source, valid for a single dataset generation"""
+
+    def __init__(self):
+        self._generation = None
+        self._pyramids = {}
+        self._lock = threading.Lock()
+
+    def get(self, generation, source, build):
+        """The pyramid for (generation, source), building it on first use"""
+        with self._lock:
+            if generation != self._generation:
+                self._generation, self._pyramids = generation, {}
+            pyramid = self._pyramids.get(source)
+            if pyramid is None:
+                # Built under the lock so concurrent map requests share one build
+                pyramid = self._pyramids[source] = build()
+            return pyramid
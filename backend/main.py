@@ -3,17 +3,44 @@ ElectroWizard - FastAPI Backend Server
 Main API server with all endpoints
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Dict, Optional
 import pandas as pd
+import asyncio
+import json
 import os
 from mongodb_config import mongo_db, init_mongodb, seed_initial_data
 
 from ml_models import PowerOutagePredictor
 from explainable_ai import create_explainer_from_model
 from restoration_priority import RestorationPrioritizer
+from micro_batching import PredictionBatcher
+from execution_pool import ExecutionPool
+from cluster_assignment import ClusterIndex
+from zone_index import ZoneIndex
+from spatial_index import SpatialIndex
+from statistics_engine import StatisticsEngine
+from geo_tiles import MIN_ZOOM, MAX_ZOOM, TilePyramid, TilePyramidCache
+from zone_query import NDJSON_MEDIA_TYPE, page_positions, parse_fields, iter_ndjson
+from model_artifacts import fast_artifacts_available
+from model_registry import ModelRegistry, ShadowScorer
+from prediction_cache import PredictionCache
+from response_cache import ResponseCache, CoalescingCache
+from event_stream import EVENT_TYPES
+from zone_store import WEATHER_ENCODING, load_zones, encode_weather, cast_like, value_counts_dict
+import shared_zones as shared_zone_store
+from prediction_table import (
+    SOURCES, SOURCE_COLUMNS, MODEL_COLUMNS, attach_prediction_table, build_prediction_table,
+    with_prediction_table, has_prediction_table, apply_source
+)
+
+IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -36,6 +63,251 @@ predictor = PowerOutagePredictor()
 explainer = None
 prioritizer = RestorationPrioritizer()
 dataset = None
+cluster_index = None
+zone_index = None
+spatial_index = None
+tile_pyramids = TilePyramidCache()
+stats_engines = {}
+
+# Multi-worker mode: dataset is a read-only view of a memory-mapped generation
+shared_zones = None
+shared_zones_task = None
+
+# Cold-start breakdown served by /api/startup-report
+MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'background')  # background | sync | off
+startup_report = {'imports_ms': IMPORT_MS}
+
+# Versioned models: live predictor, the one it replaced (for rollback) and an optional shadow
+registry = ModelRegistry()
+previous_predictor = None
+previous_prediction_table = None
+shadow_scorer = None
+model_swap_status = {'state': 'idle', 'version': None, 'error': None}
+
+# Thread pool for numpy/pandas/model work, process pool for pure-Python work
+execution_pool = ExecutionPool()
+
+# Live outage state fed by POST /api/events
+EVENT_FEATURE_COLUMNS = ['outage_duration_hours', 'outage_hour', 'is_peak_hour', 'load_demand_kw', 'weather_condition']
+active_outages = {}
+event_stats = {
+    'received': 0,
+    'batches': 0,
+    'by_type': {event_type: 0 for event_type in EVENT_TYPES},
+    'unknown_zones': 0,
+    'rows_rescored': 0,
+    'apply_ms_sum': 0.0,
+    'last_event_timestamp': None
+}
+events_lock = asyncio.Lock()
+
+def refresh_prediction_table(loaded_predictor=None):
+    """Rescore the whole dataset with the loaded models (model_* columns)"""
+    global dataset, cluster_index, zone_index, stats_engines
+    
+    if dataset is None or not predictor.models_available:
+        return
+    
+    predictor.ensure_cluster_assigner(dataset)
+    if shared_table_current(shared_zones):
+        cluster_index = ClusterIndex(dataset['model_cluster'].to_numpy(), predictor.cluster_assigner.n_clusters)
+        zone_index.refresh(dataset, ['model_risk_level'])
+        stats_engines = {**stats_engines, **build_stats_engines(dataset, ['model'])}
+        response_cache.bump()
+        print(f"🧮 Prediction table mapped from {shared_zones.generation}: {len(dataset)} zones")
+        return
+    
+    start = time.perf_counter()
+    features = shared_zones.features_for(predictor.feature_cols) if shared_zones is not None else None
+    frame = with_prediction_table(dataset, build_prediction_table(predictor, dataset, features))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    new_index = ClusterIndex(frame['model_cluster'].to_numpy(), predictor.cluster_assigner.n_clusters)
+    new_zone_index = zone_index.refreshed(frame, ['model_risk_level'])
+    new_engines = {**stats_engines, **build_stats_engines(frame, ['model'])}
+    dataset, cluster_index, zone_index, stats_engines = frame, new_index, new_zone_index, new_engines
+    response_cache.bump()
+    print(f"🧮 Prediction table ready: {len(frame)} zones scored in {elapsed_ms:.1f} ms")
+
+def shared_table_current(attached) -> bool:
+    """True when a shared generation was scored by the publisher with the live models"""
+    return (
+        attached is not None
+        and has_prediction_table(attached.df)
+        and attached.meta.get('model_version') == (predictor.version or 'local')
+    )
+
+def build_shared_zones():
+    """First worker in: load and score the zone store for a new shared generation"""
+    df, _ = load_zones()
+    if df is None:
+        return None
+    if not predictor.models_available:
+        return df, None, None
+    predictor.ensure_cluster_assigner(df)
+    attach_prediction_table(predictor, df)
+    return df, predictor.feature_cols, predictor.version or 'local'
+
+def swap_shared_zones(generation: str):
+    """Map a newly published generation and switch to it once it is fully prepared"""
+    global shared_zones, dataset, cluster_index, zone_index, spatial_index, stats_engines
+    
+    attached = shared_zone_store.attach(shared_zone_store.SHARED_ZONES_DIR, generation)
+    if predictor.models_available and not shared_table_current(attached):
+        predictor.ensure_cluster_assigner(attached.df)
+        attach_prediction_table(predictor, attached.df, attached.features_for(predictor.feature_cols))
+    new_index = (
+        ClusterIndex(attached.df['model_cluster'].to_numpy(), predictor.cluster_assigner.n_clusters)
+        if has_prediction_table(attached.df) else None
+    )
+    new_zone_index = ZoneIndex(attached.df)
+    new_spatial_index = build_spatial_index(attached.df)
+    new_stats_engines = build_stats_engines(attached.df)
+    shared_zones, dataset, cluster_index = attached, attached.df, new_index
+    zone_index, spatial_index, stats_engines = new_zone_index, new_spatial_index, new_stats_engines
+    response_cache.bump()
+    print(f"🔁 Switched to shared zone generation {generation}")
+
+async def follow_shared_zones():
+    """Poll the CURRENT pointer and swap this worker onto new generations"""
+    while True:
+        await asyncio.sleep(shared_zone_store.POLL_SECONDS)
+        try:
+            generation = shared_zone_store.current_generation(shared_zone_store.SHARED_ZONES_DIR)
+            if generation is not None and (shared_zones is None or generation != shared_zones.generation):
+                await execution_pool.run_in_thread(swap_shared_zones, generation)
+        except Exception as e:
+            print(f"⚠️ Shared zone refresh failed: {str(e)}")
+
+def predict_rows(rows):
+    """Score a list of feature dicts with whichever predictor is live"""
+    predictions = predictor.predict_impact_batch(rows)['predictions']
+    submit_shadow(rows, predictions)
+    return predictions
+
+def submit_shadow(rows, predictions):
+    """Compare against the shadow model in the background, off the response path"""
+    if shadow_scorer is not None:
+        execution_pool.thread_executor.submit(shadow_scorer.compare, rows, predictions)
+
+# Coalesces concurrent /api/predict calls into batched model runs
+batcher = PredictionBatcher(
+    predict_rows,
+    window_ms=float(os.getenv('PREDICT_BATCH_WINDOW_MS', '2')),
+    max_batch_size=int(os.getenv('PREDICT_BATCH_MAX_SIZE', '64')),
+    executor=execution_pool.thread_executor
+)
+PREDICT_BATCHING_ENABLED = os.getenv('PREDICT_BATCHING', '1') == '1'
+
+# Repeated predict/explain calls for the same zone are served from memory
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv('PREDICTION_CACHE_MAX_ENTRIES', '10000')),
+    ttl_seconds=float(os.getenv('PREDICTION_CACHE_TTL_SECONDS', '300')),
+    max_bytes=int(float(os.getenv('PREDICTION_CACHE_MAX_MB', '64')) * 1024 * 1024)
+)
+
+# Polled read endpoints serve pre-encoded bodies until the dataset changes
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256')),
+    max_bytes=int(float(os.getenv('RESPONSE_CACHE_MAX_MB', '128')) * 1024 * 1024)
+)
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE', '1') == '1'
+
+# MongoDB-backed reads polled by every dashboard: one database call per TTL, shared by concurrent polls
+mongo_read_cache = CoalescingCache(ttl_seconds=float(os.getenv('MONGO_READ_CACHE_TTL_SECONDS', '5')))
+
+async def cached_json(request: Request, generation: int, build, *args):
+    """Serve the encoded body for this endpoint and query, building it once per dataset generation
+    
+    generation is response_cache.generation as read on handler entry, before
+    the handler touched dataset or an index, so a body built from data that
+    changed in between is never stored under the newer generation.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return await execution_pool.run_in_thread(build, *args)
+    
+    key = response_cache.make_key(request.url.path, request.query_params)
+    body = response_cache.get(key)
+    if body is None:
+        body = await execution_pool.run_in_thread(lambda: response_cache.put(key, build(*args), generation))
+    return Response(content=body, media_type='application/json')
+
+def prediction_cache_key(kind: str, features_dict: dict) -> str:
+    return prediction_cache.make_key(kind, features_dict, predictor.feature_cols, predictor.version or 'local')
+
+# Keep the prediction table and cache in step with the models whenever they are reloaded
+predictor.add_load_listener(refresh_prediction_table)
+predictor.add_load_listener(lambda loaded_predictor: prediction_cache.invalidate())
+
+def build_spatial_index(df: pd.DataFrame) -> Optional[SpatialIndex]:
+    """Coordinate index for the map endpoints (None without latitude/longitude)"""
+    if 'latitude' not in df.columns or 'longitude' not in df.columns:
+        return None
+    return SpatialIndex(df['latitude'].to_numpy(), df['longitude'].to_numpy())
+
+def build_stats_engines(df: pd.DataFrame, sources=SOURCES) -> Dict[str, StatisticsEngine]:
+    """Running /api/stats aggregates for each impact source present in df"""
+    engines = {}
+    for source in sources:
+        if source == 'model' and not has_prediction_table(df):
+            continue
+        engines[source] = StatisticsEngine(
+            source, SOURCE_COLUMNS[source]['impact_score'], SOURCE_COLUMNS[source]['risk_level']
+        )
+        engines[source].rebuild(df)
+    return engines
+
+def zone_rows(column: str, labels) -> pd.DataFrame:
+    """Rows whose column is one of labels, via the secondary zone index"""
+    return dataset.iloc[zone_index.positions(column, labels)]
+
+def zone_records(zones: pd.DataFrame, source: str, fields: Optional[List[str]] = None) -> List[dict]:
+    """Serialize a zone frame to records using the requested impact source"""
+    zones = apply_source(zones, source, keep=fields or ())
+    return (zones[fields] if fields else zones).to_dict('records')
+
+async def zone_listing(request: Request, generation: int, positions, source: str, fields: Optional[str], cursor: Optional[str],
+                       limit: Optional[int], default_limit: Optional[int] = None, extra: Optional[dict] = None,
+                       total_key: str = 'total'):
+    """One page of zones as JSON, or the page streamed as NDJSON when the client asks for it"""
+    streaming = NDJSON_MEDIA_TYPE in request.headers.get('accept', '')
+    if limit is None and not streaming:
+        limit = default_limit
+    if limit is not None and limit < 0:
+        raise HTTPException(status_code=400, detail="limit must be >= 0")
+    try:
+        columns = parse_fields(fields, dataset.columns)
+        page, total, next_cursor = page_positions(positions, len(dataset), cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if streaming:
+        # Bind the current frame so a dataset swap mid-stream cannot mix generations
+        headers = {'X-Total-Count': str(total)}
+        if next_cursor:
+            headers['X-Next-Cursor'] = next_cursor
+        chunks = iter_ndjson(dataset, page, lambda zones: zone_records(zones, source, columns))
+        return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    
+    def build(frame):
+        results = zone_records(frame.iloc[page], source, columns)
+        return {
+            **(extra or {}),
+            total_key: total,
+            "returned": len(results),
+            "source": source,
+            "next_cursor": next_cursor,
+            "zones": results
+        }
+    
+    return await cached_json(request, generation, build, dataset)
+
+def resolve_source(source: str) -> str:
+    """Validate the source=model|stored switch used by the zone endpoints"""
+    if source not in SOURCES:
+        raise HTTPException(status_code=400, detail=f"source must be one of {list(SOURCES)}")
+    if source == 'model' and not has_prediction_table(dataset):
+        raise HTTPException(status_code=503, detail="Model predictions not available")
+    return source
 
 # Request/Response models
 class ZoneFeatures(BaseModel):
@@ -63,6 +335,24 @@ class PredictResponse(BaseModel):
     risk_probabilities: Dict[str, float]
     cluster: int
 
+class BatchPredictResponse(BaseModel):
+    count: int
+    predictions: List[PredictResponse]
+    timings_ms: Dict[str, float]
+
+class OutageEvent(BaseModel):
+    zone_id: str
+    event_type: str
+    event_id: Optional[int] = None
+    timestamp: Optional[str] = None
+    outage_id: Optional[int] = None
+    # Bounded to what the (downcast int8) store columns can hold
+    outage_duration_hours: Optional[float] = Field(None, ge=0)
+    outage_hour: Optional[int] = Field(None, ge=0, le=23)
+    is_peak_hour: Optional[int] = Field(None, ge=0, le=1)
+    weather_condition: Optional[str] = None
+    load_demand_kw: Optional[float] = Field(None, ge=0)
+
 class ExplanationResponse(BaseModel):
     base_value: float
     predicted_value: float
@@ -73,14 +363,31 @@ class ExplanationResponse(BaseModel):
 # Startup event - Load models
 @app.on_event("startup")
 async def startup_event():
-    global predictor, explainer, dataset
+    global predictor, explainer, dataset, zone_index, spatial_index, stats_engines, shared_zones, shared_zones_task
     
     print("🚀 Starting ElectroWizard API Server...")
     
-    # Check if models exist
-    if os.path.exists('models/xgb_model.pkl'):
+    print(f"🧵 Execution pool: {execution_pool.thread_workers} threads, "
+          f"{execution_pool.process_workers} processes")
+    
+    if PREDICT_BATCHING_ENABLED:
+        batcher.executor = execution_pool.thread_executor
+        await batcher.start()
+    
+    # Check if models exist (the last activated registry version wins)
+    current_version = registry.current_version()
+    if current_version is not None:
+        print(f"📦 Loading model version {current_version}...")
+        phase_start = time.perf_counter()
+        predictor.load_models(registry.version_dir(current_version))
+        predictor.version = current_version
+        startup_report['model_load_ms'] = (time.perf_counter() - phase_start) * 1000
+        print("✅ Models loaded successfully!")
+    elif os.path.exists('models/xgb_model.pkl') or fast_artifacts_available('models'):
         print("📦 Loading pre-trained models...")
+        phase_start = time.perf_counter()
         predictor.load_models()
+        startup_report['model_load_ms'] = (time.perf_counter() - phase_start) * 1000
         
         # Try to create explainer (optional - may fail on some systems)
         try:
@@ -101,22 +408,51 @@ async def startup_event():
     else:
         print("⚠️ No pre-trained models found. Run ml_models.py first to train models.")
     
-    # Load dataset if available
-    if os.path.exists('chennai_power_outage_data.csv'):
-        print("📊 Loading dataset...")
-        dataset = pd.read_csv('chennai_power_outage_data.csv')
+    # Load dataset if available (columnar store, rebuilt from the CSV when stale),
+    # or map the generation shared by all workers
+    print("📊 Loading dataset...")
+    if shared_zone_store.SHARED_ZONES_DIR:
+        phase_start = time.perf_counter()
+        shared_zones = shared_zone_store.attach_or_publish(build_shared_zones)
+        dataset = shared_zones.df if shared_zones is not None else None
+        dataset_info = shared_zones.info((time.perf_counter() - phase_start) * 1000) if shared_zones is not None else None
+        shared_zones_task = asyncio.create_task(follow_shared_zones())
+    else:
+        dataset, dataset_info = load_zones()
+    if dataset is not None:
+        print(f"✅ Loaded {len(dataset)} records from {dataset_info['path']} "
+              f"({dataset_info['memory_mb']:.1f} MB in memory)")
+        startup_report['dataset_load_ms'] = dataset_info['load_ms']
+        startup_report['dataset'] = dataset_info
         
-        # Encode weather_condition to weather_encoded
-        weather_mapping = {'Clear': 0, 'Rainy': 1, 'Storm': 2, 'Hot': 3}
-        if 'weather_condition' in dataset.columns:
-            dataset['weather_encoded'] = dataset['weather_condition'].map(weather_mapping).fillna(0)
-        else:
-            dataset['weather_encoded'] = 0.0
-            
-        print(f"✅ Loaded {len(dataset)} records with encoded weather")
+        phase_start = time.perf_counter()
+        zone_index = ZoneIndex(dataset)
+        startup_report['zone_index_ms'] = (time.perf_counter() - phase_start) * 1000
+        
+        phase_start = time.perf_counter()
+        spatial_index = build_spatial_index(dataset)
+        startup_report['spatial_index_ms'] = (time.perf_counter() - phase_start) * 1000
+        
+        phase_start = time.perf_counter()
+        stats_engines = build_stats_engines(dataset, ['stored'])
+        startup_report['stats_engines_ms'] = (time.perf_counter() - phase_start) * 1000
+        response_cache.bump()
+        
+        phase_start = time.perf_counter()
+        refresh_prediction_table()
+        startup_report['prediction_table_ms'] = (time.perf_counter() - phase_start) * 1000
     else:
         print("⚠️ Dataset not found. Run dataset_generator.py first.")
     
+    # Load whatever the startup path did not need yet, off the request path
+    if predictor.models_available and predictor.cluster_assigner is not None and MODEL_WARMUP != 'off':
+        sample_row = dataset[predictor.feature_cols].iloc[0].to_dict() if dataset is not None else None
+        if MODEL_WARMUP == 'sync':
+            predictor.warm_up(sample_row)
+        else:
+            predictor.warm_up(sample_row, background=True)
+            print("🔥 Model warm-up running in background")
+    
     # Initialize MongoDB
     print("🗄️ Initializing MongoDB...")
     if init_mongodb():
@@ -125,6 +461,13 @@ async def startup_event():
     else:
         print("⚠️ MongoDB not available. Using CSV data only.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if shared_zones_task is not None:
+        shared_zones_task.cancel()
+    await batcher.stop()
+    execution_pool.shutdown()
+
 # Health check endpoint
 @app.get("/")
 async def root():
@@ -134,6 +477,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "predict": "/api/predict",
+            "predict_batch": "/api/predict/batch",
             "explain": "/api/explain",
             "restoration": "/api/restoration",
             "zones": "/api/zones",
@@ -147,23 +491,125 @@ async def predict_impact(features: ZoneFeatures):
     """Predict impact score and risk level for a zone"""
     try:
         features_dict = features.dict()
-        prediction = predictor.predict_impact(features_dict)
+        cache_key = prediction_cache_key('predict', features_dict)
+        prediction = prediction_cache.get(cache_key)
+        if prediction is not None:
+            return prediction
+        
+        if batcher.running:
+            prediction = await batcher.submit(features_dict)
+        else:
+            prediction = await execution_pool.run_in_thread(predictor.predict_impact, features_dict)
+            submit_shadow([features_dict], [prediction])
+        
+        prediction_cache.put(cache_key, prediction)
         return prediction
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_zone_features_batch(body: bytes, content_type: str) -> List[dict]:
+    """Parse a JSON array or NDJSON body into validated ZoneFeatures dicts"""
+    text = body.decode('utf-8')
+    
+    if 'ndjson' in content_type or 'jsonlines' in content_type:
+        raw_rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        raw_rows = json.loads(text)
+        if not isinstance(raw_rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of zone features")
+    
+    rows = []
+    for index, raw_row in enumerate(raw_rows):
+        try:
+            rows.append(ZoneFeatures(**raw_row).dict())
+        except (TypeError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=f"Row {index}: {e}")
+    return rows
+
+# Cold-start timing breakdown
+@app.get("/api/startup-report")
+async def get_startup_report():
+    """Import vs model load vs warm-up timings for this replica"""
+    return {
+        **startup_report,
+        "warm_up_ms": predictor.load_timings.get('warm_up'),
+        "model_loads_ms": {
+            name: ms for name, ms in predictor.load_timings.items() if name not in ('warm_up', 'load_models')
+        },
+        "pending_lazy_models": sorted(predictor._loaders),
+        "inference_engine": predictor.inference_engine
+    }
+
+# Micro-batching metrics
+@app.get("/api/predict/metrics")
+async def get_predict_metrics():
+    """Queue depth, batch size and wait-time metrics for /api/predict"""
+    return batcher.metrics()
+
+# Prediction cache metrics
+@app.get("/api/predict/cache")
+async def get_prediction_cache_stats():
+    """Hit/miss/eviction counters for the predict/explain cache"""
+    return prediction_cache.stats()
+
+# Response cache metrics
+@app.get("/api/response-cache")
+async def get_response_cache_stats():
+    """Hit/miss counters and the dataset generation for the encoded response caches"""
+    return {**response_cache.stats(), 'mongo_reads': mongo_read_cache.stats()}
+
+# Batch prediction endpoint
+@app.post("/api/predict/batch", response_model=BatchPredictResponse)
+async def predict_impact_batch(request: Request):
+    """Predict impact scores for many zones (JSON array or NDJSON body)"""
+    try:
+        body = await request.body()
+        try:
+            rows = await execution_pool.run_in_thread(
+                parse_zone_features_batch, body, request.headers.get('content-type', '')
+            )
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid request body: {e}")
+        
+        if not rows:
+            return {"count": 0, "predictions": [], "timings_ms": {}}
+        
+        result = await execution_pool.run_in_thread(predictor.predict_impact_batch, rows)
+        submit_shadow(rows, result['predictions'])
+        return {
+            "count": len(result['predictions']),
+            "predictions": result['predictions'],
+            "timings_ms": result['timings']
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Explainability endpoint
 @app.post("/api/explain", response_model=ExplanationResponse)
 async def explain_prediction(features: ZoneFeatures):
     """Get explanation for why a zone is flagged at a certain risk level"""
     try:
-        if explainer is None:
-            # Return a basic explanation without SHAP
-            features_dict = features.dict()
-            prediction = predictor.predict_impact(features_dict)
-            
-            # Create basic explanation
-            basic_explanation = f"""
+        features_dict = features.dict()
+        cache_key = prediction_cache_key('explain', features_dict)
+        explanation = prediction_cache.get(cache_key)
+        if explanation is None:
+            explanation = await build_explanation(features)
+            prediction_cache.put(cache_key, explanation)
+        return explanation
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def build_explanation(features: ZoneFeatures) -> dict:
+    """SHAP explanation when available, otherwise a basic model-based summary"""
+    if explainer is None:
+        # Return a basic explanation without SHAP
+        features_dict = features.dict()
+        prediction = await execution_pool.run_in_thread(predictor.predict_impact, features_dict)
+        
+        # Create basic explanation
+        basic_explanation = f"""
 This zone has an impact score of {prediction['impact_score']:.2f} and is classified as {prediction['risk_level']} risk.
 
 Key contributing factors:
@@ -174,151 +620,486 @@ Key contributing factors:
 
 Note: Detailed SHAP analysis is currently unavailable. The system is using the ML model predictions.
 """
-            
-            return {
-                "base_value": 50.0,
-                "predicted_value": prediction['impact_score'],
-                "feature_impacts": {},
-                "explanation": basic_explanation,
-                "top_factors": [
-                    {"feature": "hospital_count", "contribution": features.hospital_count * 10, "value": features.hospital_count},
-                    {"feature": "industry_count", "contribution": features.industry_count * 5, "value": features.industry_count},
-                    {"feature": "population_density", "contribution": features.population_density * 0.01, "value": features.population_density}
-                ]
-            }
         
-        features_dict = features.dict()
-        explanation = explainer.explain_prediction(features_dict)
-        return explanation
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return {
+            "base_value": 50.0,
+            "predicted_value": prediction['impact_score'],
+            "feature_impacts": {},
+            "explanation": basic_explanation,
+            "top_factors": [
+                {"feature": "hospital_count", "contribution": features.hospital_count * 10, "value": features.hospital_count},
+                {"feature": "industry_count", "contribution": features.industry_count * 5, "value": features.industry_count},
+                {"feature": "population_density", "contribution": features.population_density * 0.01, "value": features.population_density}
+            ]
+        }
+    
+    features_dict = features.dict()
+    explanation = await execution_pool.run_in_thread(explainer.explain_prediction, features_dict)
+    return explanation
 
 # Get all zones with predictions
 @app.get("/api/zones")
-async def get_all_zones(limit: int = 1000, risk_level: Optional[str] = None):
-    """Get all zones with risk predictions"""
+async def get_all_zones(request: Request, limit: Optional[int] = None, risk_level: Optional[str] = None,
+                        source: str = 'stored', cluster: Optional[int] = None, cursor: Optional[str] = None,
+                        fields: Optional[str] = None):
+    """Get all zones with risk predictions
+    
+    Paged by cursor (pass next_cursor back), projected with fields=a,b and
+    streamed as NDJSON when the client sends Accept: application/x-ndjson.
+    """
+    generation = response_cache.generation
     try:
         if dataset is None:
             raise HTTPException(status_code=503, detail="Dataset not loaded")
+        source = resolve_source(source)
         
-        # Filter by risk level if specified
-        if risk_level:
-            filtered_data = dataset[dataset['risk_level'] == risk_level]
+        # Cluster and risk lookups go through the indexes instead of a full scan
+        risk_col = SOURCE_COLUMNS[source]['risk_level']
+        if cluster is not None:
+            if cluster_index is None:
+                raise HTTPException(status_code=503, detail="Cluster index not available")
+            positions = cluster_index.positions(cluster)
+            
+            # Filter the (small) cluster slice by risk level if specified
+            if risk_level:
+                positions = positions[dataset[risk_col].iloc[positions].to_numpy() == risk_level]
+        elif risk_level:
+            positions = zone_index.positions(risk_col, [risk_level])
         else:
-            filtered_data = dataset
+            positions = None
         
-        # Limit results
-        results = filtered_data.head(limit).to_dict('records')
-        
-        return {
-            "total": len(filtered_data),
-            "returned": len(results),
-            "zones": results
-        }
+        return await zone_listing(request, generation, positions, source, fields, cursor, limit, default_limit=1000)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Get zones by district
 @app.get("/api/zones/district/{district_name}")
-async def get_zones_by_district(district_name: str):
-    """Get all zones in a specific district"""
+async def get_zones_by_district(district_name: str, request: Request, source: str = 'stored',
+                                limit: Optional[int] = None, cursor: Optional[str] = None,
+                                fields: Optional[str] = None):
+    """Get the zones in a specific district, paged by cursor like /api/zones"""
+    generation = response_cache.generation
     try:
         if dataset is None:
             raise HTTPException(status_code=503, detail="Dataset not loaded")
+        source = resolve_source(source)
         
-        district_data = dataset[dataset['district'] == district_name]
+        positions = zone_index.positions('district', [district_name])
         
-        if len(district_data) == 0:
+        if len(positions) == 0:
             raise HTTPException(status_code=404, detail=f"District '{district_name}' not found")
         
-        return {
-            "district": district_name,
-            "total_zones": len(district_data),
-            "zones": district_data.to_dict('records')
-        }
+        return await zone_listing(request, generation, positions, source, fields, cursor, limit, default_limit=1000,
+                                  extra={"district": district_name}, total_key="total_zones")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Spatial zone queries (map viewport, radius and nearest)
+
+def check_coordinates(lat: float, lon: float):
+    if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        raise HTTPException(status_code=400, detail="lat must be within [-90, 90] and lon within [-180, 180]")
+
+def require_spatial_index(source: str) -> str:
+    if dataset is None:
+        raise HTTPException(status_code=503, detail="Dataset not loaded")
+    if spatial_index is None:
+        raise HTTPException(status_code=503, detail="Spatial index not available")
+    return resolve_source(source)
+
+def distance_records(positions, distances, source: str, fields: Optional[List[str]]) -> dict:
+    """Zones nearest first, each with its distance_km from the query point"""
+    records = zone_records(dataset.iloc[positions], source, fields)
+    for record, distance in zip(records, distances):
+        record['distance_km'] = round(float(distance), 4)
+    return {"total": len(records), "returned": len(records), "source": source, "zones": records}
+
+@app.get("/api/zones/bbox")
+async def get_zones_in_bbox(request: Request, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                            source: str = 'stored', limit: Optional[int] = None, cursor: Optional[str] = None,
+                            fields: Optional[str] = None):
+    """Zones inside a bounding box (the visible map area), paged like /api/zones"""
+    generation = response_cache.generation
+    try:
+        source = require_spatial_index(source)
+        check_coordinates(min_lat, min_lon)
+        check_coordinates(max_lat, max_lon)
+        if min_lat > max_lat or min_lon > max_lon:
+            raise HTTPException(status_code=400, detail="min_lat/min_lon must not exceed max_lat/max_lon")
+        
+        positions = spatial_index.bbox(min_lat, min_lon, max_lat, max_lon)
+        return await zone_listing(request, generation, positions, source, fields, cursor, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/zones/near")
+async def get_zones_near(request: Request, lat: float, lon: float, radius_km: float = 2.0, source: str = 'stored',
+                         limit: int = 1000, fields: Optional[str] = None):
+    """Zones within radius_km of a point, nearest first"""
+    generation = response_cache.generation
+    try:
+        source = require_spatial_index(source)
+        check_coordinates(lat, lon)
+        if radius_km <= 0 or limit < 0:
+            raise HTTPException(status_code=400, detail="radius_km must be > 0 and limit >= 0")
+        try:
+            columns = parse_fields(fields, dataset.columns)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        def build():
+            positions, distances = spatial_index.near(lat, lon, radius_km)
+            body = distance_records(positions[:limit], distances[:limit], source, columns)
+            body['total'] = len(positions)
+            return body
+        
+        return await cached_json(request, generation, build)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/zones/nearest")
+async def get_nearest_zones(request: Request, lat: float, lon: float, k: int = 10, source: str = 'stored',
+                            fields: Optional[str] = None):
+    """The k zones nearest to a point, nearest first"""
+    generation = response_cache.generation
+    try:
+        source = require_spatial_index(source)
+        check_coordinates(lat, lon)
+        if not 1 <= k <= 10000:
+            raise HTTPException(status_code=400, detail="k must be between 1 and 10000")
+        try:
+            columns = parse_fields(fields, dataset.columns)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        def build():
+            positions, distances = spatial_index.nearest(lat, lon, k)
+            return distance_records(positions, distances, source, columns)
+        
+        return await cached_json(request, generation, build)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/zones/tiles")
+async def get_zone_tiles(request: Request, zoom: int, source: str = 'stored', min_lat: Optional[float] = None,
+                         min_lon: Optional[float] = None, max_lat: Optional[float] = None,
+                         max_lon: Optional[float] = None):
+    """Zones aggregated into map tiles at a zoom level (count, impact, risk histogram, hospitals)"""
+    generation = response_cache.generation
+    try:
+        if dataset is None:
+            raise HTTPException(status_code=503, detail="Dataset not loaded")
+        source = resolve_source(source)
+        if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+            raise HTTPException(status_code=400, detail=f"zoom must be between {MIN_ZOOM} and {MAX_ZOOM}")
+        
+        bbox_params = [min_lat, min_lon, max_lat, max_lon]
+        if any(value is not None for value in bbox_params):
+            if any(value is None for value in bbox_params):
+                raise HTTPException(status_code=400, detail="A bbox needs min_lat, min_lon, max_lat and max_lon")
+            check_coordinates(min_lat, min_lon)
+            check_coordinates(max_lat, max_lon)
+            bbox = tuple(bbox_params)
+        else:
+            bbox = None
+        
+        def build():
+            pyramid = tile_pyramids.get(response_cache.generation, source, lambda: build_tile_pyramid(source))
+            cells = pyramid.cells(zoom, bbox)
+            return {
+                "zoom": zoom,
+                "source": source,
+                "total_zones": pyramid.zones,
+                "zones_in_cells": sum(cell['count'] for cell in cells),
+                "cells": cells
+            }
+        
+        return await cached_json(request, generation, build)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def build_tile_pyramid(source: str) -> TilePyramid:
+    """Aggregate the dataset into tiles for every zoom level (once per generation and source)"""
+    columns = SOURCE_COLUMNS[source]
+    return TilePyramid(
+        dataset['latitude'].to_numpy(),
+        dataset['longitude'].to_numpy(),
+        dataset[columns['impact_score']].to_numpy(),
+        dataset[columns['risk_level']],
+        dataset['hospital_count'].to_numpy()
+    )
+
 # Restoration prioritization endpoint
 @app.post("/api/restoration/prioritize")
-async def prioritize_restoration(zone_ids: Optional[List[str]] = None, available_crews: int = 5):
+async def prioritize_restoration(zone_ids: Optional[List[str]] = None, available_crews: int = 5,
+                                 source: str = 'stored', active_only: bool = False):
     """Get prioritized restoration plan"""
     try:
         if dataset is None:
             raise HTTPException(status_code=503, detail="Dataset not loaded")
+        source = resolve_source(source)
         
         # If specific zones provided, filter; otherwise use high-risk zones
-        if zone_ids:
-            zones_data = dataset[dataset['zone_id'].isin(zone_ids)].to_dict('records')
+        if active_only:
+            zones_data = zone_rows('zone_id', list(active_outages))
+        elif zone_ids:
+            zones_data = zone_rows('zone_id', zone_ids)
         else:
             # Get high and critical risk zones
-            zones_data = dataset[dataset['risk_level'].isin(['High', 'Critical'])].to_dict('records')
+            zones_data = zone_rows(SOURCE_COLUMNS[source]['risk_level'], ['High', 'Critical'])
         
-        if not zones_data:
+        if zones_data.empty:
             return {"message": "No zones to prioritize"}
         
-        # Prioritize zones
-        prioritized = prioritizer.prioritize_zones(zones_data)
-        
-        # Generate restoration plan
-        plan = prioritizer.generate_restoration_plan(prioritized, available_crews)
+        # Score the zone columns in one vectorized pass; only each phase's top zones become records
+        plan = await execution_pool.run_in_thread(
+            prioritizer.generate_restoration_plan_frame, apply_source(zones_data, source), available_crews
+        )
         
         return plan
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Get restoration ETA for specific zone
 @app.get("/api/restoration/eta/{zone_id}")
-async def get_restoration_eta(zone_id: str, available_crews: int = 5):
+async def get_restoration_eta(zone_id: str, available_crews: int = 5, source: str = 'stored'):
     """Get estimated restoration time for a specific zone"""
     try:
         if dataset is None:
             raise HTTPException(status_code=503, detail="Dataset not loaded")
+        source = resolve_source(source)
         
         # Get all affected zones
-        zones_data = dataset[dataset['risk_level'].isin(['High', 'Critical'])].to_dict('records')
-        prioritized = prioritizer.prioritize_zones(zones_data)
-        
-        eta = prioritizer.get_zone_eta(zone_id, prioritized, available_crews)
+        zones_data = zone_rows(SOURCE_COLUMNS[source]['risk_level'], ['High', 'Critical'])
+        eta = await execution_pool.run_in_thread(
+            prioritizer.get_zone_eta_frame, zone_id, apply_source(zones_data, source), available_crews
+        )
         
         return eta
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Statistics endpoint
 @app.get("/api/stats")
-async def get_statistics():
+async def get_statistics(request: Request, source: str = 'stored'):
     """Get overall statistics and insights"""
+    generation = response_cache.generation
     try:
         if dataset is None:
             raise HTTPException(status_code=503, detail="Dataset not loaded")
+        source = resolve_source(source)
         
-        stats = {
-            "total_zones": len(dataset),
-            "risk_distribution": dataset['risk_level'].value_counts().to_dict(),
-            "district_distribution": dataset['district'].value_counts().to_dict(),
-            "average_impact_score": float(dataset['impact_score'].mean()),
-            "total_hospitals": int(dataset['hospital_count'].sum()),
-            "total_industries": int(dataset['industry_count'].sum()),
-            "total_population_affected": int(dataset['population_density'].sum()),
-            "critical_zones": len(dataset[dataset['risk_level'] == 'Critical']),
-            "high_risk_zones": len(dataset[dataset['risk_level'] == 'High']),
-            "districts": {
-                district: {
-                    "total_zones": int(district_data['zone_id'].count()),
-                    "avg_impact": float(district_data['impact_score'].mean()),
-                    "risk_breakdown": district_data['risk_level'].value_counts().to_dict()
-                }
-                for district, district_data in dataset.groupby('district')
-            }
+        # Running aggregates: the snapshot costs O(districts), not a scan of the zones
+        return await cached_json(request, generation, stats_engines[source].snapshot)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Cluster endpoints
+@app.get("/api/clusters")
+async def get_clusters():
+    """List K-Means clusters with their sizes and centroids"""
+    if cluster_index is None or predictor.cluster_assigner is None:
+        raise HTTPException(status_code=503, detail="Cluster index not available")
+    
+    sizes = cluster_index.sizes()
+    centroids = predictor.cluster_assigner.centroids_original_units()
+    return {
+        "clusters": [
+            {"cluster": k, "total_zones": sizes[k], "centroid": centroids[k]}
+            for k in range(cluster_index.n_clusters)
+        ]
+    }
+
+@app.get("/api/clusters/{cluster_id}/stats")
+async def get_cluster_statistics(cluster_id: int, source: str = 'stored'):
+    """Statistics for the zones in one cluster"""
+    try:
+        if dataset is None or cluster_index is None:
+            raise HTTPException(status_code=503, detail="Cluster index not available")
+        source = resolve_source(source)
+        
+        positions = cluster_index.positions(cluster_id)
+        if len(positions) == 0:
+            raise HTTPException(status_code=404, detail=f"Cluster {cluster_id} has no zones")
+        
+        cluster_data = dataset.iloc[positions]
+        impact_col = SOURCE_COLUMNS[source]['impact_score']
+        risk_col = SOURCE_COLUMNS[source]['risk_level']
+        
+        return {
+            "cluster": cluster_id,
+            "source": source,
+            "total_zones": len(cluster_data),
+            "avg_impact": float(cluster_data[impact_col].mean()),
+            "total_hospitals": int(cluster_data['hospital_count'].sum()),
+            "total_industries": int(cluster_data['industry_count'].sum()),
+            "risk_breakdown": value_counts_dict(cluster_data[risk_col]),
+            "district_breakdown": value_counts_dict(cluster_data['district'])
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Outage event ingestion
+
+def set_rows(frame: pd.DataFrame, column: str, positions, values):
+    """Write values at row positions by swapping in an updated copy of the column
+    
+    Never writes into an array frame may share with the live dataset.
+    """
+    updated = frame[column].copy()
+    updated.iloc[positions] = values
+    frame[column] = updated
+
+def apply_events(events: List[dict]) -> dict:
+    """Fold a batch of outage events into the zone rows and rescore only those rows
+    
+    The batch is written to a shallow copy of the dataset, each touched
+    column replaced by an updated copy (set_rows), and that frame replaces
+    the live one once complete, so concurrent readers never see
+    half-applied rows. This holds on pandas 2.x without copy-on-write too.
+    """
+    global dataset, cluster_index
+    
+    start = time.perf_counter()
+    for event in events:
+        if event['event_type'] == 'outage_restore':
+            active_outages.pop(event['zone_id'], None)
+        else:
+            active_outages[event['zone_id']] = {
+                'outage_id': event.get('outage_id'),
+                'timestamp': event.get('timestamp'),
+                'outage_duration_hours': event.get('outage_duration_hours'),
+                'event_type': event['event_type']
+            }
+        event_stats['by_type'][event['event_type']] += 1
+    
+    # The last event per zone in the batch carries its current readings
+    latest = pd.DataFrame(events).drop_duplicates('zone_id', keep='last').set_index('zone_id')
+    frame = dataset.copy(deep=False)
+    positions = zone_index.zone_positions(latest.index)
+    rows = frame.index[positions]
+    row_zones = frame.loc[rows, 'zone_id']
+    engines = list(stats_engines.values())
+    stats_before = [frame.loc[rows, engine.columns] for engine in engines]
+    
+    for column in EVENT_FEATURE_COLUMNS:
+        if column not in latest:
+            continue
+        values = latest[column].reindex(row_zones).to_numpy()
+        present = ~pd.isna(values)
+        if present.any():
+            # Cast to the store dtype (int8 counts, categorical weather) so columns keep their types
+            set_rows(frame, column, positions[present], cast_like(values[present], frame[column].dtype))
+    set_rows(frame, 'weather_encoded', positions,
+             encode_weather(frame.loc[rows, ['weather_condition']])['weather_encoded'].to_numpy())
+    
+    rescored = 0
+    moved_clusters = changed_risk = positions[:0]
+    if len(rows) and has_prediction_table(frame) and predictor.models_available:
+        old_clusters = frame.loc[rows, 'model_cluster'].to_numpy()
+        old_risk_levels = frame.loc[rows, 'model_risk_level'].to_numpy()
+        table = build_prediction_table(predictor, frame.loc[rows])
+        for column in MODEL_COLUMNS:
+            set_rows(frame, column, positions, table[column].to_numpy())
+        rescored = len(rows)
+        moved = table['model_cluster'].to_numpy() != old_clusters
+        moved_clusters, new_clusters = positions[moved], table['model_cluster'].to_numpy()[moved]
+        changed_risk = positions[table['model_risk_level'].to_numpy() != old_risk_levels]
+    
+    if len(rows):
+        dataset = frame
+        # Only the rows that changed are re-indexed (no full rebuild per batch)
+        if len(moved_clusters):
+            cluster_index = cluster_index.updated(moved_clusters, new_clusters)
+        if len(changed_risk):
+            zone_index.update(frame, 'model_risk_level', changed_risk)
+        for engine, before in zip(engines, stats_before):
+            engine.update(before, frame.loc[rows, engine.columns])
+        response_cache.bump()
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    unknown = int((~latest.index.isin(row_zones)).sum())
+    event_stats['received'] += len(events)
+    event_stats['batches'] += 1
+    event_stats['unknown_zones'] += unknown
+    event_stats['rows_rescored'] += rescored
+    event_stats['apply_ms_sum'] += elapsed_ms
+    event_stats['last_event_timestamp'] = events[-1].get('timestamp')
+    
+    return {
+        'accepted': len(events),
+        'zones_updated': int(row_zones.nunique()),
+        'unknown_zones': unknown,
+        'rows_rescored': rescored,
+        'active_outages': len(active_outages),
+        'elapsed_ms': elapsed_ms
+    }
+
+@app.post("/api/events")
+async def ingest_events(events: List[OutageEvent]):
+    """Ingest outage start/update/restore events and rescore the affected zones"""
+    try:
+        if dataset is None:
+            raise HTTPException(status_code=503, detail="Dataset not loaded")
+        if shared_zones is not None:
+            raise HTTPException(status_code=409, detail="Event ingestion needs a private dataset; unset SHARED_ZONES_DIR "
+                                                        "or fold events in and publish a new shared generation")
+        invalid = sorted({event.event_type for event in events} - set(EVENT_TYPES))
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Unknown event_type {invalid}; expected {list(EVENT_TYPES)}")
+        invalid = sorted({event.weather_condition for event in events if event.weather_condition} - set(WEATHER_ENCODING))
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Unknown weather_condition {invalid}; expected {list(WEATHER_ENCODING)}")
+        if not events:
+            return {'accepted': 0, 'active_outages': len(active_outages)}
         
-        return stats
+        # Batches are applied one at a time so a zone's events stay in order
+        async with events_lock:
+            return await execution_pool.run_in_thread(apply_events, [event.dict() for event in events])
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/events/stats")
+async def get_event_stats():
+    """Ingestion counters and the number of zones currently without power"""
+    return {
+        **event_stats,
+        'mean_apply_ms': event_stats['apply_ms_sum'] / (event_stats['batches'] or 1),
+        'active_outages': len(active_outages)
+    }
+
+@app.get("/api/events/active")
+async def get_active_outages(limit: int = 1000):
+    """Zones with an outage that has started but not been restored"""
+    zones = list(active_outages.items())[:limit]
+    return {
+        'total': len(active_outages),
+        'returned': len(zones),
+        'outages': [{'zone_id': zone_id, **state} for zone_id, state in zones]
+    }
+
 # Feature importance endpoint
 @app.get("/api/model/feature-importance")
 async def get_feature_importance():
@@ -334,39 +1115,188 @@ async def get_feature_importance():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Model registry / hot swap admin endpoints
+
+def prepare_candidate(version: str):
+    """Load a registry version fully and warm it up (runs in a thread)"""
+    candidate = registry.load_predictor(version, inference_engine=predictor.inference_engine)
+    candidate.load_all()
+    if dataset is not None:
+        candidate.ensure_cluster_assigner(dataset)
+        candidate.warm_up(dataset[candidate.feature_cols].iloc[0].to_dict())
+    return candidate
+
+def prepare_swap(candidate, table=None, rescore=False) -> dict:
+    """Build everything swap_predictor installs for candidate (runs in a thread)
+    
+    Rescores the dataset with candidate, or reuses a saved table on
+    rollback, and builds the new frame, indexes and stats engines. Call it
+    under events_lock so no event batch lands between the build and the swap.
+    """
+    base = dataset
+    prepared = {'outgoing_table': base[MODEL_COLUMNS].copy() if has_prediction_table(base) else None}
+    if base is not None and rescore:
+        table = build_prediction_table(candidate, base)
+    if base is not None and table is not None:
+        frame = with_prediction_table(base, table)
+        prepared.update(
+            dataset=frame,
+            cluster_index=ClusterIndex(frame['model_cluster'].to_numpy(), candidate.cluster_assigner.n_clusters),
+            zone_index=zone_index.refreshed(frame, ['model_risk_level']),
+            stats_engines={**stats_engines, **build_stats_engines(frame, ['model'])}
+        )
+    return prepared
+
+def swap_predictor(candidate, prepared: dict, keep_previous=True):
+    """Atomically make candidate the live predictor (runs on the event loop)
+    
+    Only swaps references; the O(N) work is done by prepare_swap.
+    """
+    global predictor, previous_predictor, previous_prediction_table, dataset, cluster_index, zone_index, stats_engines
+    
+    if keep_previous:
+        previous_predictor, previous_prediction_table = predictor, prepared['outgoing_table']
+    
+    predictor = candidate
+    prediction_cache.invalidate()
+    if 'dataset' in prepared:
+        dataset, cluster_index = prepared['dataset'], prepared['cluster_index']
+        zone_index, stats_engines = prepared['zone_index'], prepared['stats_engines']
+        response_cache.bump()
+    if predictor.version is not None:
+        registry.set_current(predictor.version)
+    else:
+        registry.clear_current()
+    print(f"🔁 Live model is now {predictor.version or 'local'}")
+
+async def activate_in_background(version: str):
+    try:
+        candidate = await execution_pool.run_in_thread(prepare_candidate, version)
+        # Not while an event batch is rewriting the model columns of a copy
+        async with events_lock:
+            prepared = await execution_pool.run_in_thread(prepare_swap, candidate, None, True)
+            swap_predictor(candidate, prepared)
+        model_swap_status.update(state='active', error=None)
+    except Exception as e:
+        model_swap_status.update(state='failed', error=str(e))
+        print(f"❌ Model version {version} failed to load: {e}")
+
+@app.get("/api/admin/models")
+async def list_model_versions():
+    """Registered versions plus live, previous and shadow versions"""
+    return {
+        "live_version": predictor.version or 'local',
+        "previous_version": (previous_predictor.version or 'local') if previous_predictor else None,
+        "shadow_version": shadow_scorer.version if shadow_scorer else None,
+        "swap_status": model_swap_status,
+        "versions": registry.list_versions()
+    }
+
+@app.post("/api/admin/models/{version}/activate")
+async def activate_model_version(version: str):
+    """Load a version in the background and swap it in once it is ready"""
+    if not registry.has_version(version):
+        raise HTTPException(status_code=404, detail=f"Model version '{version}' not found")
+    if model_swap_status['state'] == 'loading':
+        raise HTTPException(status_code=409, detail=f"Version {model_swap_status['version']} is already loading")
+    
+    model_swap_status.update(state='loading', version=version, error=None)
+    asyncio.create_task(activate_in_background(version))
+    return {"status": "loading", "version": version}
+
+@app.post("/api/admin/models/rollback")
+async def rollback_model_version():
+    """Swap back to the predictor that was live before the last activation"""
+    if previous_predictor is None:
+        raise HTTPException(status_code=409, detail="No previous model version to roll back to")
+    
+    async with events_lock:
+        candidate = previous_predictor
+        prepared = await execution_pool.run_in_thread(prepare_swap, candidate, previous_prediction_table)
+        swap_predictor(candidate, prepared)
+    model_swap_status.update(state='rolled_back', version=predictor.version, error=None)
+    return {"status": "rolled_back", "live_version": predictor.version or 'local'}
+
+@app.post("/api/admin/models/{version}/shadow")
+async def start_shadow_scoring(version: str):
+    """Score live predict traffic with a version alongside the live model"""
+    global shadow_scorer
+    
+    if not registry.has_version(version):
+        raise HTTPException(status_code=404, detail=f"Model version '{version}' not found")
+    try:
+        candidate = await execution_pool.run_in_thread(
+            registry.load_predictor, version, predictor.inference_engine, False
+        )
+        if dataset is not None:
+            candidate.ensure_cluster_assigner(dataset)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    shadow_scorer = ShadowScorer(candidate, version)
+    return {"status": "shadowing", "version": version}
+
+@app.get("/api/admin/models/shadow")
+async def get_shadow_stats():
+    """Agreement and impact-difference stats for the shadow version"""
+    if shadow_scorer is None:
+        raise HTTPException(status_code=404, detail="No shadow model configured")
+    return shadow_scorer.stats()
+
+@app.delete("/api/admin/models/shadow")
+async def stop_shadow_scoring():
+    global shadow_scorer
+    
+    stats = shadow_scorer.stats() if shadow_scorer is not None else None
+    shadow_scorer = None
+    return {"status": "stopped", "final_stats": stats}
+
 # MongoDB-powered endpoints
 
+def grid_stats_body(total: int, risk_counts: Dict[str, int]) -> dict:
+    high_risk = risk_counts.get('Critical', 0)
+    medium_risk = risk_counts.get('Medium', 0)
+    low_risk = risk_counts.get('Low', 0)
+    return {
+        'total_zones': total,
+        'high_risk': high_risk,
+        'medium_risk': medium_risk,
+        'safe': low_risk,
+        'risk_distribution': {
+            'high': high_risk,
+            'medium': medium_risk,
+            'low': low_risk
+        }
+    }
+
+def mongo_grid_stats(zones_coll) -> dict:
+    """Grid statistics from one $group pass over the zones collection"""
+    risk_counts = {
+        group['_id']: group['count']
+        for group in zones_coll.aggregate([{'$group': {'_id': '$risk_level', 'count': {'$sum': 1}}}])
+    }
+    return grid_stats_body(sum(risk_counts.values()), risk_counts)
+
+def dataset_grid_stats() -> dict:
+    """Grid statistics from the loaded dataset's running aggregates (MongoDB fallback)"""
+    if dataset is None or 'stored' not in stats_engines:
+        return grid_stats_body(0, {})
+    return grid_stats_body(*stats_engines['stored'].risk_counts())
+
 @app.get("/api/grid/stats")
-async def get_grid_stats():
+async def get_grid_stats(request: Request):
     """Get real-time grid statistics from MongoDB"""
+    generation = response_cache.generation
     try:
         zones_coll = mongo_db.get_collection('zones')
         if zones_coll is None:
             # Fallback to CSV data
-            if dataset is not None:
-                total = len(dataset)
-                high_risk = len(dataset[dataset['risk_level'] == 'Critical'])
-                medium_risk = len(dataset[dataset['risk_level'] == 'Medium'])
-                low_risk = len(dataset[dataset['risk_level'] == 'Low'])
-            else:
-                total, high_risk, medium_risk, low_risk = 0, 0, 0, 0
-        else:
-            total = zones_coll.count_documents({})
-            high_risk = zones_coll.count_documents({'risk_level': 'Critical'})
-            medium_risk = zones_coll.count_documents({'risk_level': 'Medium'})
-            low_risk = zones_coll.count_documents({'risk_level': 'Low'})
+            return await cached_json(request, generation, dataset_grid_stats)
         
-        return {
-            'total_zones': total,
-            'high_risk': high_risk,
-            'medium_risk': medium_risk,
-            'safe': low_risk,
-            'risk_distribution': {
-                'high': high_risk,
-                'medium': medium_risk,
-                'low': low_risk
-            }
-        }
+        body = await mongo_read_cache.get(
+            'grid_stats', lambda: execution_pool.run_in_thread(mongo_grid_stats, zones_coll)
+        )
+        return Response(content=body, media_type='application/json')
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -414,7 +1344,8 @@ async def simulate_cascade(outage_cause: str, origin_zone: str, duration_hours:
         if zones_coll is not None:
             origin = zones_coll.find_one({'zone_id': origin_zone})
         else:
-            origin = dataset[dataset['zone_id'] == origin_zone].iloc[0].to_dict() if dataset is not None else None
+            position = zone_index.first('zone_id', origin_zone) if dataset is not None else None
+            origin = dataset.iloc[position].to_dict() if position is not None else None
         
         if not origin:
             raise HTTPException(status_code=404, detail="Origin zone not found")
@@ -545,7 +1476,7 @@ async def get_ai_restoration_plan(affected_zones: List[str], available_crews: in
         if zones_coll is not None:
             zones = list(zones_coll.find({'zone_id': {'$in': affected_zones}}, {'_id': 0}))
         else:
-            zones = dataset[dataset['zone_id'].isin(affected_zones)].to_dict('records') if dataset is not None else []
+            zones = zone_rows('zone_id', affected_zones).to_dict('records') if dataset is not None else []
         
         # AI-powered priority sorting (by impact score)
         zones_sorted = sorted(zones, key=lambda x: x.get('impact_score', 0), reverse=True)
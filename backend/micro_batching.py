@@ -0,0 +1,163 @@
+"""
+ElectroWizard - Micro-Batching Module
+Coalesces concurrent /api/predict calls into batched model runs
+"""
+
+import asyncio
+import time
+from collections import deque
+
+
+class PredictionBatcher:
+    """Holds predict requests for a short window and scores them as one batch
+
+    A batch is flushed when `max_batch_size` requests are waiting or when the
+    oldest request has waited `window_ms`, whichever comes first. The batch
+    function runs in an executor so the event loop stays free meanwhile.
+    """
+
+    def __init__(self, predict_batch_fn, window_ms=2.0, max_batch_size=64, executor=None,
+                 history_size=1024):
+        self.predict_batch_fn = predict_batch_fn
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+
+        self._pending = deque()
+        self._has_items = None
+        self._batch_full = None
+        self._worker = None
+
+        # Metrics
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._max_batch_seen = 0
+        self._batch_sizes = deque(maxlen=history_size)
+        self._wait_ms = deque(maxlen=history_size)
+        self._run_ms = deque(maxlen=history_size)
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        """Start the background batching loop on the running event loop"""
+        if self.running:
+            return
+        self._has_items = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+        print(f"📥 Prediction batcher started (window {self.window_ms} ms, max batch {self.max_batch_size})")
+
+    async def stop(self):
+        """Cancel the batching loop and fail any requests still queued"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while self._pending:
+            _, future, _ = self._pending.popleft()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def submit(self, features_dict):
+        """Queue one row and wait for its own prediction"""
+        if not self.running:
+            raise RuntimeError("Prediction batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((features_dict, future, time.perf_counter()))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._has_items.wait()
+
+            # Give late arrivals until the oldest request's window expires
+            if len(self._pending) < self.max_batch_size:
+                oldest_wait = time.perf_counter() - self._pending[0][2]
+                remaining = self.window_ms / 1000 - oldest_wait
+                if remaining > 0:
+                    try:
+                        await asyncio.wait_for(self._batch_full.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+
+            batch = [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+            if not self._pending:
+                self._has_items.clear()
+            if len(self._pending) < self.max_batch_size:
+                self._batch_full.clear()
+
+            await self._execute(loop, batch)
+
+    async def _execute(self, loop, batch):
+        started = time.perf_counter()
+        rows = [row for row, _, _ in batch]
+
+        try:
+            predictions = await loop.run_in_executor(self.executor, self.predict_batch_fn, rows)
+        except Exception as e:
+            self._errors += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            finished = time.perf_counter()
+            self._requests += len(batch)
+            self._batches += 1
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            self._batch_sizes.append(len(batch))
+            self._run_ms.append((finished - started) * 1000)
+            self._wait_ms.extend((started - enqueued) * 1000 for _, _, enqueued in batch)
+
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def metrics(self):
+        """Queue depth, batch size and wait-time statistics"""
+        wait_ms = sorted(self._wait_ms)
+
+        def percentile(values, q):
+            if not values:
+                return 0.0
+            return float(values[min(len(values) - 1, int(q * len(values)))])
+
+        return {
+            'running': self.running,
+            'window_ms': self.window_ms,
+            'max_batch_size': self.max_batch_size,
+            'queue_depth': len(self._pending),
+            'requests': self._requests,
+            'batches': self._batches,
+            'errors': self._errors,
+            'batch_size': {
+                'mean': sum(self._batch_sizes) / len(self._batch_sizes) if self._batch_sizes else 0.0,
+                'max': self._max_batch_seen,
+                'last': self._batch_sizes[-1] if self._batch_sizes else 0
+            },
+            'wait_ms': {
+                'mean': sum(wait_ms) / len(wait_ms) if wait_ms else 0.0,
+                'p50': percentile(wait_ms, 0.50),
+                'p99': percentile(wait_ms, 0.99),
+                'max': wait_ms[-1] if wait_ms else 0.0
+            },
+            'batch_run_ms': {
+                'mean': sum(self._run_ms) / len(self._run_ms) if self._run_ms else 0.0,
+                'max': max(self._run_ms) if self._run_ms else 0.0
+            }
+        }
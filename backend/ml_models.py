@@ -5,25 +5,100 @@ Implements XGBoost, Random Forest, Decision Tree, and K-Means models
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import xgboost as xgb
-from sklearn.metrics import accuracy_score, mean_squared_error, r2_score
 import joblib
+import json
 import os
+import threading
+import time
+from cluster_assignment import ClusterAssigner
+import model_artifacts
+from zone_store import encode_weather
+
+# sklearn and xgboost are imported where they are used so that serving
+# processes only pay for them when a model is actually loaded or trained
+
+def _lazy_model(name):
+    """Model attribute that runs its registered loader on first access"""
+    attr = f'_{name}'
+    
+    def getter(self):
+        value = getattr(self, attr, None)
+        if value is None:
+            # A reader arriving while another thread loads waits here for the
+            # result; the loader is only dropped once the model is in place
+            with self._loader_lock:
+                value = getattr(self, attr, None)
+                loader = self._loaders.get(name)
+                if value is None and loader is not None:
+                    start = time.perf_counter()
+                    value = loader()
+                    setattr(self, attr, value)
+                    self._loaders.pop(name, None)
+                    self.load_timings[name] = (time.perf_counter() - start) * 1000
+        return value
+    
+    def setter(self, value):
+        self._loaders.pop(name, None)
+        setattr(self, attr, value)
+    
+    return property(getter, setter)
 
 class PowerOutagePredictor:
     """Complete ML pipeline for power outage impact prediction"""
     
-    def __init__(self):
+    RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+    CLUSTER_FEATURES = ['population_density', 'hospital_count', 'industry_count', 'load_demand_kw']
+    
+    # Estimator settings shared by train_models() and training_pipeline
+    MODEL_PARAMS = {
+        'xgb_model': {
+            'n_estimators': 200,
+            'max_depth': 8,
+            'learning_rate': 0.1,
+            'subsample': 0.8,
+            'colsample_bytree': 0.8,
+            'random_state': 42
+        },
+        'rf_classifier': {
+            'n_estimators': 150,
+            'max_depth': 10,
+            'min_samples_split': 5,
+            'random_state': 42
+        },
+        'dt_classifier': {
+            'max_depth': 8,
+            'min_samples_split': 10,
+            'random_state': 42
+        },
+        'kmeans_model': {
+            'n_clusters': 5,
+            'random_state': 42,
+            'n_init': 10
+        }
+    }
+    
+    xgb_model = _lazy_model('xgb_model')
+    rf_classifier = _lazy_model('rf_classifier')
+    dt_classifier = _lazy_model('dt_classifier')
+    kmeans_model = _lazy_model('kmeans_model')
+    scaler = _lazy_model('scaler')
+    
+    def __init__(self, inference_engine=None):
+        # 'native' scores through sklearn/xgboost, 'compiled' through flattened tree arrays
+        self.inference_engine = inference_engine or os.getenv('ELECTROWIZARD_INFERENCE_ENGINE', 'native')
+        self.compiled_engine = None
+        self.version = None  # set when loaded from the model registry
+        self.watermark = None  # {'source', 'offset'}: rows of the source the models have seen
+        self._load_listeners = []
+        self._loaders = {}
+        self._loader_lock = threading.Lock()
+        self.load_timings = {}
         self.xgb_model = None
         self.rf_classifier = None
         self.dt_classifier = None
         self.kmeans_model = None
-        self.scaler = StandardScaler()
+        self.cluster_assigner = None
+        self.scaler = None
         
         # Feature columns
         self.feature_cols = [
@@ -38,20 +113,35 @@ class PowerOutagePredictor:
         print(f"📊 Loading data from {filepath}...")
         df = pd.read_csv(filepath)
         
-        # Encode weather condition
-        weather_mapping = {'Clear': 0, 'Rain': 1, 'Storm': 2, 'Hot': 0.5}
-        df['weather_encoded'] = df['weather_condition'].map(weather_mapping)
+        self.encode_columns(df)
+        self.feature_cols.append('weather_encoded')
+        self.watermark = {'source': filepath, 'offset': len(df)}
         
-        # Encode risk level
-        risk_mapping = {'Low': 0, 'Medium': 1, 'High': 2, 'Critical': 3}
-        df['risk_encoded'] = df['risk_level'].map(risk_mapping)
+        return df
+    
+    @staticmethod
+    def encode_columns(df):
+        """Add the weather_encoded and risk_encoded columns in place"""
+        # Encode weather condition (the one mapping shared with the zone store)
+        encode_weather(df)
         
-        self.feature_cols.append('weather_encoded')
+        # Encode risk level
+        if 'risk_level' in df:
+            risk_mapping = {'Low': 0, 'Medium': 1, 'High': 2, 'Critical': 3}
+            df['risk_encoded'] = df['risk_level'].astype(object).map(risk_mapping)
         
         return df
     
     def train_models(self, df):
         """Train all ML models"""
+        from sklearn.model_selection import train_test_split
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.metrics import accuracy_score, mean_squared_error, r2_score
+        import xgboost as xgb
+        
         print("\n🤖 Training Machine Learning Models...")
         print("=" * 60)
         
@@ -66,19 +156,13 @@ class PowerOutagePredictor:
         )
         
         # Scale features
+        self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
         # 1. XGBoost Regressor - Primary Impact Prediction
         print("\n1️⃣ Training XGBoost Regressor (Impact Score Prediction)...")
-        self.xgb_model = xgb.XGBRegressor(
-            n_estimators=200,
-            max_depth=8,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42
-        )
+        self.xgb_model = xgb.XGBRegressor(**self.MODEL_PARAMS['xgb_model'])
         self.xgb_model.fit(X_train, y_impact_train)
         
         y_pred_xgb = self.xgb_model.predict(X_test)
@@ -88,13 +172,9 @@ class PowerOutagePredictor:
         
         # 2. Random Forest Classifier - Risk Level Classification
         print("\n2️⃣ Training Random Forest Classifier (Risk Level)...")
-        self.rf_classifier = RandomForestClassifier(
-            n_estimators=150,
-            max_depth=10,
-            min_samples_split=5,
-            random_state=42
-        )
+        self.rf_classifier = RandomForestClassifier(**self.MODEL_PARAMS['rf_classifier'], n_jobs=-1)
         self.rf_classifier.fit(X_train_scaled, y_risk_train)
+        self.rf_classifier.n_jobs = None  # serve single-threaded (see _register_loaders)
         
         y_pred_rf = self.rf_classifier.predict(X_test_scaled)
         acc_rf = accuracy_score(y_risk_test, y_pred_rf)
@@ -102,11 +182,7 @@ class PowerOutagePredictor:
         
         # 3. Decision Tree - Explainable Model
         print("\n3️⃣ Training Decision Tree (Explainable Model)...")
-        self.dt_classifier = DecisionTreeClassifier(
-            max_depth=8,
-            min_samples_split=10,
-            random_state=42
-        )
+        self.dt_classifier = DecisionTreeClassifier(**self.MODEL_PARAMS['dt_classifier'])
         self.dt_classifier.fit(X_train_scaled, y_risk_train)
         
         y_pred_dt = self.dt_classifier.predict(X_test_scaled)
@@ -115,10 +191,15 @@ class PowerOutagePredictor:
         
         # 4. K-Means Clustering - Zone Grouping
         print("\n4️⃣ Training K-Means Clustering (Zone Grouping)...")
-        self.kmeans_model = KMeans(n_clusters=5, random_state=42, n_init=10)
-        cluster_features = X[['population_density', 'hospital_count', 'industry_count', 'load_demand_kw']]
-        cluster_features_scaled = StandardScaler().fit_transform(cluster_features)
+        self.kmeans_model = KMeans(**self.MODEL_PARAMS['kmeans_model'])
+        cluster_features = X[self.CLUSTER_FEATURES]
+        cluster_scaler = StandardScaler()
+        cluster_features_scaled = cluster_scaler.fit_transform(cluster_features)
         self.kmeans_model.fit(cluster_features_scaled)
+        self.cluster_assigner = ClusterAssigner.from_kmeans(
+            self.kmeans_model, cluster_scaler, self.CLUSTER_FEATURES,
+            counts=np.bincount(self.kmeans_model.labels_, minlength=self.kmeans_model.n_clusters)
+        )
         print(f"   ✓ K-Means trained with 5 clusters")
         
         print("\n✅ All models trained successfully!")
@@ -129,8 +210,76 @@ class PowerOutagePredictor:
             'dt_accuracy': acc_dt
         }
     
+    def update_incremental(self, new_df, xgb_rounds=20, rf_trees=10, watermark=None):
+        """Warm-start the models on newly appended rows instead of retraining
+        
+        XGBoost continues boosting from the current booster, the forest grows
+        rf_trees more trees (warm_start) and the cluster centroids take one
+        mini-batch step. The scaler and the single explainable decision tree
+        are left as trained. Models are updated in place, so call this on a
+        predictor loaded for training (e.g. from the registry), not the live one.
+        """
+        import xgboost as xgb
+        
+        if self.cluster_assigner is None:
+            raise RuntimeError("Cluster assigner not available; retrain or call ensure_cluster_assigner()")
+        
+        timings = {}
+        self.load_all()
+        
+        X = new_df[self.feature_cols]
+        y_impact = new_df['impact_score']
+        y_risk = new_df['risk_encoded'].to_numpy()
+        
+        print(f"\n🔁 Incremental update on {len(new_df):,} new rows...")
+        
+        # 1. XGBoost: extra boosting rounds on top of the existing booster
+        start = time.perf_counter()
+        xgb_model = xgb.XGBRegressor(**{**self.MODEL_PARAMS['xgb_model'], 'n_estimators': xgb_rounds})
+        xgb_model.fit(X, y_impact, xgb_model=self.xgb_model.get_booster())
+        self.xgb_model = xgb_model
+        timings['xgb_model'] = time.perf_counter() - start
+        print(f"   ✓ XGBoost boosted {xgb_rounds} more rounds ({xgb_model.get_booster().num_boosted_rounds()} total)")
+        
+        # 2. Random Forest: warm_start only adds trees, which must see every class
+        start = time.perf_counter()
+        rf_updated = set(np.unique(y_risk)) == set(self.rf_classifier.classes_)
+        if rf_updated:
+            self.rf_classifier.set_params(warm_start=True, n_estimators=len(self.rf_classifier.estimators_) + rf_trees)
+            self.rf_classifier.fit(self.scaler.transform(X), y_risk)
+            self.rf_classifier.set_params(warm_start=False)
+            print(f"   ✓ Random Forest grown to {len(self.rf_classifier.estimators_)} trees")
+        else:
+            print("   ⚠️ Random Forest skipped: new rows do not cover every risk level")
+        timings['rf_classifier'] = time.perf_counter() - start
+        
+        # 3. K-Means: mini-batch centroid update, kept in sync with the sklearn model
+        start = time.perf_counter()
+        self.cluster_assigner = self.cluster_assigner.partial_fit(X[self.CLUSTER_FEATURES].to_numpy())
+        self.kmeans_model.cluster_centers_ = self.cluster_assigner.centroids.copy()
+        timings['kmeans_model'] = time.perf_counter() - start
+        print("   ✓ K-Means centroids updated")
+        
+        if self.compiled_engine is not None:
+            from compiled_inference import CompiledPredictor
+            self.compiled_engine = CompiledPredictor.from_predictor(self)
+        
+        if watermark is None and self.watermark is not None:
+            watermark = {**self.watermark, 'offset': self.watermark['offset'] + len(new_df)}
+        self.watermark = watermark
+        
+        return {
+            'rows': len(new_df),
+            'rf_updated': rf_updated,
+            'watermark': watermark,
+            'timings': timings
+        }
+    
     def predict_impact(self, features_dict):
         """Predict impact score for a single zone"""
+        if self.compiled_engine is not None:
+            return self.compiled_engine.predict_impact(features_dict)
+        
         # Convert dict to DataFrame
         X = pd.DataFrame([features_dict])[self.feature_cols]
         
@@ -143,9 +292,7 @@ class PowerOutagePredictor:
         risk_proba = self.rf_classifier.predict_proba(X_scaled)[0]
         
         # K-Means cluster
-        cluster_features = X[['population_density', 'hospital_count', 'industry_count', 'load_demand_kw']]
-        cluster_features_scaled = StandardScaler().fit_transform(cluster_features)
-        cluster = self.kmeans_model.predict(cluster_features_scaled)[0]
+        cluster = self.assign_clusters(X[self.CLUSTER_FEATURES].to_numpy())[0]
         
         risk_levels = ['Low', 'Medium', 'High', 'Critical']
         
@@ -161,6 +308,111 @@ class PowerOutagePredictor:
             'cluster': int(cluster)
         }
     
+    def predict_impact_batch(self, rows):
+        """Predict impact scores for many zones, returned in input order"""
+        start = time.perf_counter()
+        X = pd.DataFrame.from_records(list(rows), columns=self.feature_cols)
+        prepare_ms = (time.perf_counter() - start) * 1000
+        
+        arrays = self.predict_arrays(X)
+        timings = {'prepare_ms': prepare_ms, **arrays['timings']}
+        
+        start = time.perf_counter()
+        predictions = [
+            {
+                'impact_score': impact,
+                'risk_level': self.RISK_LEVELS[risk_class],
+                'risk_probabilities': dict(zip(self.RISK_LEVELS, proba)),
+                'cluster': cluster
+            }
+            for impact, risk_class, proba, cluster in zip(
+                arrays['impact_score'].tolist(),
+                arrays['risk_class'].tolist(),
+                arrays['risk_proba'].tolist(),
+                arrays['cluster'].tolist()
+            )
+        ]
+        timings['format_ms'] = (time.perf_counter() - start) * 1000
+        timings['total_ms'] = sum(timings.values())
+        
+        return {'predictions': predictions, 'timings': timings}
+    
+    def predict_arrays(self, X):
+        """Run each model once over a feature matrix and return column arrays
+        
+        X is a DataFrame, or an ndarray already in feature_cols order (the
+        shared zone feature matrix).
+        """
+        if self.compiled_engine is not None:
+            start = time.perf_counter()
+            matrix = X if isinstance(X, np.ndarray) else X[self.feature_cols].to_numpy(dtype=np.float64)
+            result = self.compiled_engine.predict_matrix(matrix)
+            result['timings'] = {'compiled_ms': (time.perf_counter() - start) * 1000}
+            return result
+        
+        timings = {}
+        
+        # One contiguous float64 block shared by every model
+        start = time.perf_counter()
+        if isinstance(X, np.ndarray):
+            X = pd.DataFrame(X, columns=self.feature_cols)
+        X = X[self.feature_cols].astype(np.float64)
+        timings['matrix_ms'] = (time.perf_counter() - start) * 1000
+        
+        # XGBoost prediction
+        start = time.perf_counter()
+        impact_scores = self.xgb_model.predict(X)
+        timings['xgboost_ms'] = (time.perf_counter() - start) * 1000
+        
+        # Random Forest classification (predict == argmax of predict_proba)
+        start = time.perf_counter()
+        X_scaled = self.scaler.transform(X)
+        risk_proba = self.rf_classifier.predict_proba(X_scaled)
+        risk_class = self.rf_classifier.classes_[np.argmax(risk_proba, axis=1)].astype(int)
+        timings['random_forest_ms'] = (time.perf_counter() - start) * 1000
+        
+        # K-Means cluster
+        start = time.perf_counter()
+        clusters = self.assign_clusters(X[self.CLUSTER_FEATURES].to_numpy())
+        timings['kmeans_ms'] = (time.perf_counter() - start) * 1000
+        
+        return {
+            'impact_score': impact_scores.astype(np.float64),
+            'risk_class': risk_class,
+            'risk_proba': risk_proba,
+            'cluster': clusters.astype(int),
+            'timings': timings
+        }
+    
+    def assign_clusters(self, cluster_features):
+        """Assign K-Means clusters to raw (unscaled) cluster feature rows"""
+        assigner = self.cluster_assigner or self.ensure_cluster_assigner()
+        if assigner is None:
+            raise RuntimeError("Cluster assigner not available; retrain or call ensure_cluster_assigner()")
+        return assigner.assign(cluster_features)
+    
+    def ensure_cluster_assigner(self, df=None):
+        """Rebuild the cluster scaler from training data for artifacts saved without one
+        
+        Without df the rows are read from the training CSV named in the
+        watermark, so inference never depends on a dataset being loaded.
+        """
+        if self.cluster_assigner is None and self.kmeans_model is not None:
+            if df is None:
+                df = self.read_training_rows(self.CLUSTER_FEATURES)
+            self.cluster_assigner = ClusterAssigner.fit_scaler(self.kmeans_model, df[self.CLUSTER_FEATURES])
+            print("🧭 Cluster scaler rebuilt from dataset")
+        return self.cluster_assigner
+    
+    def read_training_rows(self, columns=None):
+        """The rows the loaded models were trained on (per the watermark)"""
+        watermark = self.watermark or {}
+        source = watermark.get('source', 'chennai_power_outage_data.csv')
+        if not os.path.exists(source):
+            raise RuntimeError(f"Cluster assigner not available and training data {source} not found; "
+                               "retrain or call ensure_cluster_assigner() with the training rows")
+        return pd.read_csv(source, usecols=columns, nrows=watermark.get('offset'))
+    
     def get_feature_importance(self):
         """Get feature importance from XGBoost model"""
         importance = self.xgb_model.feature_importances_
@@ -175,21 +427,127 @@ class PowerOutagePredictor:
         joblib.dump(self.rf_classifier, f'{directory}/rf_classifier.pkl')
         joblib.dump(self.dt_classifier, f'{directory}/dt_classifier.pkl')
         joblib.dump(self.kmeans_model, f'{directory}/kmeans_model.pkl')
+        joblib.dump(self.cluster_assigner, f'{directory}/cluster_assigner.pkl')
         joblib.dump(self.scaler, f'{directory}/scaler.pkl')
         joblib.dump(self.feature_cols, f'{directory}/feature_cols.pkl')
+        with open(f'{directory}/watermark.json', 'w') as f:
+            json.dump(self.watermark, f)
+        model_artifacts.export_fast_artifacts(self, directory)
         
         print(f"\n💾 Models saved to {directory}/")
     
-    def load_models(self, directory='models'):
-        """Load pre-trained models"""
-        self.xgb_model = joblib.load(f'{directory}/xgb_model.pkl')
-        self.rf_classifier = joblib.load(f'{directory}/rf_classifier.pkl')
-        self.dt_classifier = joblib.load(f'{directory}/dt_classifier.pkl')
-        self.kmeans_model = joblib.load(f'{directory}/kmeans_model.pkl')
-        self.scaler = joblib.load(f'{directory}/scaler.pkl')
-        self.feature_cols = joblib.load(f'{directory}/feature_cols.pkl')
+    @property
+    def models_available(self):
+        """True once models are loaded or registered for lazy loading"""
+        return self._xgb_model is not None or 'xgb_model' in self._loaders or self.compiled_engine is not None
+    
+    def load_models(self, directory='models', lazy=True):
+        """Load pre-trained models
         
-        print(f"✅ Models loaded from {directory}/")
+        With lazy=True the heavy models are only registered here and loaded on
+        first use (or by warm_up()). The fast artifact set from
+        model_artifacts.export_fast_artifacts() is preferred when present.
+        """
+        start = time.perf_counter()
+        fast = model_artifacts.fast_artifacts_available(directory)
+        
+        self._register_loaders(directory, fast)
+        
+        if fast:
+            self.feature_cols = model_artifacts.load_manifest(directory)['feature_cols']
+            self.cluster_assigner = model_artifacts.load_cluster_assigner(directory)
+        else:
+            self.feature_cols = joblib.load(f'{directory}/feature_cols.pkl')
+            # Older artifact sets predate the persisted cluster scaler
+            if os.path.exists(f'{directory}/cluster_assigner.pkl'):
+                self.cluster_assigner = joblib.load(f'{directory}/cluster_assigner.pkl')
+            else:
+                self.cluster_assigner = None
+                print("⚠️ cluster_assigner.pkl not found; cluster scaler will be rebuilt from the training data")
+        
+        self.watermark = None
+        if os.path.exists(f'{directory}/watermark.json'):
+            with open(f'{directory}/watermark.json') as f:
+                self.watermark = json.load(f)
+        
+        if not lazy:
+            self.load_all()
+        
+        self.compiled_engine = None
+        if self.inference_engine == 'compiled':
+            if fast:
+                self.compiled_engine = model_artifacts.load_compiled_predictor(self, directory)
+            else:
+                from compiled_inference import CompiledPredictor
+                self.compiled_engine = CompiledPredictor.from_predictor(self)
+            print("⚡ Compiled inference engine ready")
+        
+        self.load_timings['load_models'] = (time.perf_counter() - start) * 1000
+        print(f"✅ Models {'registered' if lazy else 'loaded'} from {directory}/"
+              f"{' (fast artifacts)' if fast else ''}")
+        
+        for listener in self._load_listeners:
+            listener(self)
+    
+    def _register_loaders(self, directory, fast):
+        """Register on-demand loaders for each heavy model artifact"""
+        def load_xgb():
+            if fast:
+                import xgboost as xgb
+                model = xgb.XGBRegressor()
+                model.load_model(os.path.join(directory, model_artifacts.XGB_NATIVE_FILE))
+                return model
+            return joblib.load(f'{directory}/xgb_model.pkl')
+        
+        def load_rf():
+            # Predictions already run on executor and micro-batcher threads; a
+            # training-time n_jobs would start a joblib pool in every predict_proba
+            model = joblib.load(f'{directory}/rf_classifier.pkl')
+            model.n_jobs = None
+            return model
+        
+        self.xgb_model = None
+        self.rf_classifier = None
+        self.dt_classifier = None
+        self.kmeans_model = None
+        self.scaler = None
+        self._loaders.update({
+            'xgb_model': load_xgb,
+            'rf_classifier': load_rf,
+            'dt_classifier': lambda: joblib.load(f'{directory}/dt_classifier.pkl'),
+            'kmeans_model': lambda: joblib.load(f'{directory}/kmeans_model.pkl'),
+            'scaler': lambda: joblib.load(f'{directory}/scaler.pkl')
+        })
+    
+    def load_all(self):
+        """Force every lazily registered model to load now"""
+        for name in list(self._loaders):
+            getattr(self, name)
+    
+    def warm_up(self, sample_row=None, background=False):
+        """Load all models and run one prediction so the first request is fast
+        
+        Returns the warm-up thread when background=True, else the elapsed ms.
+        """
+        def run():
+            start = time.perf_counter()
+            self.load_all()
+            row = sample_row or {col: 0.0 for col in self.feature_cols}
+            self.predict_impact_batch([row])
+            if self.compiled_engine is not None:
+                self.compiled_engine.predict_impact(row)
+            self.load_timings['warm_up'] = (time.perf_counter() - start) * 1000
+            return self.load_timings['warm_up']
+        
+        if background:
+            thread = threading.Thread(target=run, name='model-warmup', daemon=True)
+            thread.start()
+            return thread
+        return run()
+    
+    def add_load_listener(self, listener):
+        """Register a callback run with this predictor after every load_models()"""
+        self._load_listeners.append(listener)
 
 def main():
     """Train and save all models"""
@@ -214,6 +572,10 @@ def main():
     # Save models
     predictor.save_models()
     
+    # Register the run as a new version that the API can activate without a restart
+    from model_registry import ModelRegistry
+    ModelRegistry().publish(predictor, metrics)
+    
     print("\n🎉 Training complete!")
 
 if __name__ == "__main__":
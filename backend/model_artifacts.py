@@ -0,0 +1,140 @@
+"""
+ElectroWizard - Model Artifacts Module
+Fast-loading artifact format: xgboost's native booster file plus
+memory-mappable NumPy arrays for the flattened trees, scalers and centroids
+"""
+
+import json
+import os
+import numpy as np
+
+FAST_DIR = 'fast'
+XGB_NATIVE_FILE = 'xgb_model.ubj'
+ENSEMBLE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+
+def fast_artifacts_available(directory='models'):
+    """True when export_fast_artifacts() has been run for this directory"""
+    return os.path.exists(os.path.join(directory, FAST_DIR, 'manifest.json'))
+
+
+def _save_ensemble(ensemble, directory, name):
+    path = os.path.join(directory, name)
+    os.makedirs(path, exist_ok=True)
+    for array_name in ENSEMBLE_ARRAYS:
+        np.save(os.path.join(path, f'{array_name}.npy'), getattr(ensemble, array_name))
+    if ensemble.default_left is not None:
+        np.save(os.path.join(path, 'default_left.npy'), ensemble.default_left)
+    return {'max_depth': int(ensemble.max_depth), 'inclusive': bool(ensemble.inclusive)}
+
+
+def load_ensemble(directory, name, meta, mmap_mode='r'):
+    """Map a flattened tree ensemble back from its .npy files"""
+    from compiled_inference import FlatTreeEnsemble
+
+    path = os.path.join(directory, name)
+    arrays = {
+        array_name: np.load(os.path.join(path, f'{array_name}.npy'), mmap_mode=mmap_mode)
+        for array_name in ENSEMBLE_ARRAYS
+    }
+    default_left_path = os.path.join(path, 'default_left.npy')
+    if os.path.exists(default_left_path):
+        arrays['default_left'] = np.load(default_left_path, mmap_mode=mmap_mode)
+
+    return FlatTreeEnsemble(max_depth=meta['max_depth'], inclusive=meta['inclusive'], **arrays)
+
+
+def export_fast_artifacts(predictor, directory='models'):
+    """Write the fast-loading artifact set next to the joblib pickles"""
+    from compiled_inference import CompiledPredictor
+
+    fast_dir = os.path.join(directory, FAST_DIR)
+    os.makedirs(fast_dir, exist_ok=True)
+
+    # Native booster loads without unpickling the sklearn wrapper
+    predictor.xgb_model.save_model(os.path.join(directory, XGB_NATIVE_FILE))
+
+    compiled = CompiledPredictor.from_predictor(predictor)
+    manifest = {
+        'feature_cols': list(predictor.feature_cols),
+        'xgb_base_score': float(compiled.xgb_base_score),
+        'rf_classes': compiled.rf_classes.tolist(),
+        'xgb_trees': _save_ensemble(compiled.xgb_trees, fast_dir, 'xgb_trees'),
+        'rf_trees': _save_ensemble(compiled.rf_trees, fast_dir, 'rf_trees'),
+        'cluster_features': list(predictor.cluster_assigner.feature_names)
+    }
+
+    np.save(os.path.join(fast_dir, 'scaler_mean.npy'), predictor.scaler.mean_)
+    np.save(os.path.join(fast_dir, 'scaler_scale.npy'), predictor.scaler.scale_)
+    np.save(os.path.join(fast_dir, 'cluster_centroids.npy'), predictor.cluster_assigner.centroids)
+    np.save(os.path.join(fast_dir, 'cluster_mean.npy'), predictor.cluster_assigner.mean)
+    np.save(os.path.join(fast_dir, 'cluster_scale.npy'), predictor.cluster_assigner.scale)
+    if getattr(predictor.cluster_assigner, 'counts', None) is not None:
+        np.save(os.path.join(fast_dir, 'cluster_counts.npy'), predictor.cluster_assigner.counts)
+
+    # Manifest last: its presence marks the artifact set as complete
+    with open(os.path.join(fast_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"⚡ Fast artifacts written to {fast_dir}/")
+
+
+def load_manifest(directory='models'):
+    with open(os.path.join(directory, FAST_DIR, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def load_cluster_assigner(directory='models', mmap_mode='r'):
+    """Rebuild the ClusterAssigner from its centroid and scaler arrays"""
+    from cluster_assignment import ClusterAssigner
+
+    fast_dir = os.path.join(directory, FAST_DIR)
+    manifest = load_manifest(directory)
+    counts_path = os.path.join(fast_dir, 'cluster_counts.npy')
+    return ClusterAssigner(
+        centroids=np.load(os.path.join(fast_dir, 'cluster_centroids.npy'), mmap_mode=mmap_mode),
+        mean=np.load(os.path.join(fast_dir, 'cluster_mean.npy'), mmap_mode=mmap_mode),
+        scale=np.load(os.path.join(fast_dir, 'cluster_scale.npy'), mmap_mode=mmap_mode),
+        feature_names=manifest['cluster_features'],
+        counts=np.load(counts_path) if os.path.exists(counts_path) else None
+    )
+
+
+def load_compiled_predictor(predictor, directory='models', mmap_mode='r'):
+    """Build a CompiledPredictor straight from the mapped arrays
+
+    Neither xgboost nor the pickled forest is touched, so the compiled engine
+    can serve before the native models have been loaded.
+    """
+    from compiled_inference import CompiledPredictor
+
+    fast_dir = os.path.join(directory, FAST_DIR)
+    manifest = load_manifest(directory)
+    feature_cols = manifest['feature_cols']
+
+    return CompiledPredictor(
+        feature_cols=feature_cols,
+        xgb_trees=load_ensemble(fast_dir, 'xgb_trees', manifest['xgb_trees'], mmap_mode),
+        xgb_base_score=manifest['xgb_base_score'],
+        rf_trees=load_ensemble(fast_dir, 'rf_trees', manifest['rf_trees'], mmap_mode),
+        rf_classes=manifest['rf_classes'],
+        scaler_mean=np.load(os.path.join(fast_dir, 'scaler_mean.npy'), mmap_mode=mmap_mode),
+        scaler_scale=np.load(os.path.join(fast_dir, 'scaler_scale.npy'), mmap_mode=mmap_mode),
+        cluster_idx=[feature_cols.index(col) for col in manifest['cluster_features']],
+        assign_clusters=predictor.assign_clusters
+    )
+
+
+def main():
+    """Convert the joblib artifacts in models/ to the fast-loading format"""
+    from ml_models import PowerOutagePredictor
+
+    predictor = PowerOutagePredictor()
+    df = predictor.load_data()
+    predictor.load_models(lazy=False)
+    predictor.ensure_cluster_assigner(df)
+    export_fast_artifacts(predictor)
+
+
+if __name__ == "__main__":
+    main()
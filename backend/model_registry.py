@@ -0,0 +1,176 @@
+"""
+ElectroWizard - Model Registry Module
+Versioned model directories with manifests, plus shadow scoring
+used when swapping the live predictor without a restart
+"""
+
+import json
+import os
+import threading
+import time
+import numpy as np
+
+from ml_models import PowerOutagePredictor
+
+REGISTRY_DIR = os.path.join('models', 'registry')
+
+
+class ModelRegistry:
+    """Versioned model store: <root>/<version>/ with a manifest.json each
+
+    A CURRENT file records the version the API should serve, so a restarted
+    replica comes back on the last activated version.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def has_version(self, version):
+        return os.path.exists(os.path.join(self.version_dir(version), 'manifest.json'))
+
+    def read_manifest(self, version):
+        with open(os.path.join(self.version_dir(version), 'manifest.json')) as f:
+            return json.load(f)
+
+    def list_versions(self):
+        """All published manifests, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        manifests = [
+            self.read_manifest(version)
+            for version in os.listdir(self.root)
+            if self.has_version(version)
+        ]
+        return sorted(manifests, key=lambda m: m['created_at'])
+
+    @staticmethod
+    def new_version():
+        return time.strftime('v%Y%m%d-%H%M%S')
+
+    def publish(self, predictor, metrics, version=None, extra=None):
+        """Save a trained predictor as a new version and write its manifest
+
+        version may name a directory already holding staged artifacts (see
+        training_pipeline); it only becomes a version once the manifest exists.
+        """
+        version = version or self.new_version()
+        directory = self.version_dir(version)
+        if self.has_version(version):
+            raise ValueError(f"Model version '{version}' already exists")
+
+        predictor.save_models(directory)
+
+        manifest = {
+            'version': version,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'feature_cols': list(predictor.feature_cols),
+            'metrics': {name: float(value) for name, value in metrics.items()},
+            'watermark': predictor.watermark,
+            **(extra or {})
+        }
+        # Manifest last and renamed into place: a version without one is incomplete and ignored
+        tmp_path = os.path.join(directory, 'manifest.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(directory, 'manifest.json'))
+
+        print(f"📚 Published model version {version} to {directory}/")
+        return manifest
+
+    def load_predictor(self, version, inference_engine=None, lazy=True):
+        """Create a fresh PowerOutagePredictor from a registered version"""
+        if not self.has_version(version):
+            raise KeyError(f"Model version '{version}' not found")
+
+        manifest = self.read_manifest(version)
+        predictor = PowerOutagePredictor(inference_engine=inference_engine)
+        predictor.load_models(self.version_dir(version), lazy=lazy)
+        if list(predictor.feature_cols) != manifest['feature_cols']:
+            raise ValueError(f"Model version '{version}' artifacts do not match its manifest feature_cols")
+        predictor.version = version
+        predictor.watermark = manifest.get('watermark', predictor.watermark)
+        return predictor
+
+    def current_version(self):
+        path = os.path.join(self.root, 'CURRENT')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            version = f.read().strip()
+        return version if self.has_version(version) else None
+
+    def set_current(self, version):
+        """Atomically point CURRENT at a version"""
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, 'CURRENT.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, 'CURRENT'))
+
+    def clear_current(self):
+        """Fall back to the unversioned models/ directory on next start"""
+        path = os.path.join(self.root, 'CURRENT')
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class ShadowScorer:
+    """Scores live traffic with a candidate predictor and tracks disagreement"""
+
+    def __init__(self, predictor, version):
+        self.predictor = predictor
+        self.version = version
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.risk_agreements = 0
+        self.cluster_agreements = 0
+        self.abs_impact_diff_sum = 0.0
+        self.max_abs_impact_diff = 0.0
+        self.shadow_ms_sum = 0.0
+
+    def compare(self, rows, primary_predictions):
+        """Score rows with the shadow model and fold the differences into the stats"""
+        start = time.perf_counter()
+        try:
+            shadow_predictions = self.predictor.predict_impact_batch(rows)['predictions']
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        impact_diff = np.abs(
+            np.array([p['impact_score'] for p in primary_predictions]) -
+            np.array([p['impact_score'] for p in shadow_predictions])
+        )
+        risk_agree = sum(p['risk_level'] == s['risk_level'] for p, s in zip(primary_predictions, shadow_predictions))
+        cluster_agree = sum(p['cluster'] == s['cluster'] for p, s in zip(primary_predictions, shadow_predictions))
+
+        with self._lock:
+            self.rows += len(rows)
+            self.batches += 1
+            self.risk_agreements += risk_agree
+            self.cluster_agreements += cluster_agree
+            self.abs_impact_diff_sum += float(impact_diff.sum())
+            self.max_abs_impact_diff = max(self.max_abs_impact_diff, float(impact_diff.max(initial=0.0)))
+            self.shadow_ms_sum += elapsed_ms
+
+    def stats(self):
+        with self._lock:
+            rows = self.rows or 1
+            return {
+                'version': self.version,
+                'rows_compared': self.rows,
+                'batches': self.batches,
+                'errors': self.errors,
+                'risk_agreement': self.risk_agreements / rows,
+                'cluster_agreement': self.cluster_agreements / rows,
+                'mean_abs_impact_diff': self.abs_impact_diff_sum / rows,
+                'max_abs_impact_diff': self.max_abs_impact_diff,
+                'mean_shadow_batch_ms': self.shadow_ms_sum / (self.batches or 1)
+            }
@@ -78,20 +78,14 @@ def init_mongodb():
 
 def seed_initial_data():
     """Seed initial data from CSV to MongoDB"""
-    import pandas as pd
+    from zone_store import load_zones
     
-    # Load CSV data
-    if not os.path.exists('chennai_power_outage_data.csv'):
+    # Same zone frame (and weather encoding) the API serves
+    df, _ = load_zones()
+    if df is None:
         print("⚠️ CSV file not found. Skipping seed.")
         return
     
-    df = pd.read_csv('chennai_power_outage_data.csv')
-    
-    # Encode weather
-    weather_mapping = {'Clear': 0, 'Rainy': 1, 'Storm': 2, 'Hot': 3}
-    if 'weather_condition' in df.columns:
-        df['weather_encoded'] = df['weather_condition'].map(weather_mapping).fillna(0)
-    
     # Convert to dict
     zones_data = df.to_dict('records')
     
@@ -0,0 +1,105 @@
+"""
+ElectroWizard - Prediction Cache Module
+Bounded LRU/TTL cache for /api/predict and /api/explain results keyed by
+a canonical hash of the feature vector and the live model version
+"""
+
+import hashlib
+import json
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with TTL, entry-count and memory bounds
+
+    Sizes are estimated from the JSON encoding of each value, which is close
+    to what the cached response costs to hold and cheap to compute.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300.0, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(kind, features_dict, feature_cols, model_version):
+        """Canonical key: every feature as float64 in model column order"""
+        values = [float(features_dict.get(col, 0.0)) + 0.0 for col in feature_cols]  # + 0.0 folds -0.0
+        digest = hashlib.blake2b(struct.pack(f'<{len(values)}d', *values), digest_size=16)
+        digest.update(f'|{kind}|{model_version}'.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self):
+        """Drop every entry (called when the live model changes)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
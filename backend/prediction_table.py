@@ -0,0 +1,98 @@
+"""
+ElectroWizard - Prediction Table Module
+Scores the loaded zone dataset with the live models in one batched pass
+and keeps the results as model_* columns alongside the stored values
+"""
+
+import time
+import pandas as pd
+
+SOURCES = ('stored', 'model')
+
+PROBABILITY_COLUMNS = {
+    'Low': 'model_prob_low',
+    'Medium': 'model_prob_medium',
+    'High': 'model_prob_high',
+    'Critical': 'model_prob_critical'
+}
+
+MODEL_COLUMNS = [
+    'model_impact_score',
+    'model_risk_level',
+    *PROBABILITY_COLUMNS.values(),
+    'model_cluster'
+]
+
+# Columns each source reads the zone's impact score and risk level from
+SOURCE_COLUMNS = {
+    'stored': {'impact_score': 'impact_score', 'risk_level': 'risk_level'},
+    'model': {'impact_score': 'model_impact_score', 'risk_level': 'model_risk_level'}
+}
+
+
+def build_prediction_table(predictor, df, features=None):
+    """Run every model once over the dataset and return the model_* columns
+
+    features: optional precomputed feature matrix for df's rows, in
+    predictor.feature_cols order (e.g. the shared memory-mapped one).
+    """
+    arrays = predictor.predict_arrays(features if features is not None else df)
+    risk_levels = pd.Categorical.from_codes(arrays['risk_class'], categories=predictor.RISK_LEVELS)
+
+    table = pd.DataFrame({
+        'model_impact_score': arrays['impact_score'],
+        'model_risk_level': risk_levels.astype(str),
+        **{
+            column: arrays['risk_proba'][:, i]
+            for i, column in enumerate(PROBABILITY_COLUMNS.values())
+        },
+        'model_cluster': arrays['cluster']
+    }, index=df.index)
+
+    return table
+
+
+def attach_prediction_table(predictor, df, features=None):
+    """Recompute the model_* columns on df in place; returns timing info"""
+    start = time.perf_counter()
+    table = build_prediction_table(predictor, df, features)
+    df[MODEL_COLUMNS] = table[MODEL_COLUMNS]
+
+    return {
+        'rows': len(df),
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    }
+
+
+def with_prediction_table(df, table):
+    """Shallow copy of df with the model_* columns replaced by table's
+
+    Whole columns are swapped rather than written into, so df itself is
+    never modified, with or without pandas copy-on-write.
+    """
+    frame = df.copy(deep=False)
+    for column in MODEL_COLUMNS:
+        frame[column] = table[column]
+    return frame
+
+
+def has_prediction_table(df):
+    """True when df carries a complete set of model_* columns"""
+    return df is not None and all(column in df.columns for column in MODEL_COLUMNS)
+
+
+def apply_source(df, source, keep=()):
+    """Return df with impact_score/risk_level taken from the requested source
+
+    The model_* columns only appear with source=model (or when named in
+    keep), so stored responses keep the shape they had before the table.
+    """
+    if source == 'stored':
+        hidden = [column for column in MODEL_COLUMNS if column in df.columns and column not in keep]
+        return df.drop(columns=hidden) if hidden else df
+
+    columns = SOURCE_COLUMNS[source]
+    return df.assign(
+        impact_score=df[columns['impact_score']],
+        risk_level=df[columns['risk_level']]
+    )
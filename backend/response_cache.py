@@ -0,0 +1,182 @@
+"""
+ElectroWizard - Response Cache Module
+Pre-encoded JSON bodies for the hot polled read endpoints, keyed by
+endpoint and query parameters and valid for one dataset generation
+(or, for data held outside the process, for a short TTL)
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(value):
+    # numpy scalars that slipped through to_dict()/aggregations
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(obj):
+    """Compact JSON bytes: orjson when installed, the json module otherwise"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':'), default=_json_default).encode()
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded response bodies for the current dataset generation
+
+    Anything that changes the data calls bump(), which advances the
+    generation and drops every body. A body built from an older generation
+    is returned to its caller but never stored.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=128 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+
+        self._entries = OrderedDict()  # key -> body
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_builds = 0
+
+    @staticmethod
+    def make_key(path, query_params):
+        """Endpoint plus its (Starlette) query parameters, independent of their order"""
+        return path, tuple(sorted(query_params.multi_items()))
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, value, generation):
+        """Encode value and keep it if the data has not changed since generation"""
+        body = encode_json(value)
+        with self._lock:
+            if generation != self.generation:
+                self.stale_builds += 1
+                return body
+            if len(body) > self.max_bytes:
+                return body
+
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = body
+            self._bytes += len(body)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= len(oldest)
+                self.evictions += 1
+        return body
+
+    def bump(self):
+        """The dataset changed: start a new generation and drop every body"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'encoder': 'orjson' if orjson is not None else 'json',
+                'generation': self.generation,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'stale_builds': self.stale_builds
+            }
+
+
+class CoalescingCache:
+    """Encoded bodies kept for ttl_seconds, for data the process does not own
+
+    Used where no dataset generation says when the data changed (MongoDB).
+    Concurrent misses for a key share one in-flight build, so a burst of
+    polls costs one backend call. Runs on the event loop, so no lock.
+    """
+
+    def __init__(self, ttl_seconds=5.0):
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = {}  # key -> (body, expires_at)
+        self._in_flight = {}  # key -> task building the body
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def get(self, key, build):
+        """The cached body for key, or await build() (a coroutine function) to make it"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self.hits += 1
+            return entry[0]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            self.misses += 1
+            # Its own task, so the build outlives whichever caller started it
+            in_flight = asyncio.ensure_future(self._build(key, build))
+            in_flight.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._in_flight[key] = in_flight
+        else:
+            self.coalesced += 1
+
+        # Shielded so one caller going away does not cancel the shared build
+        return await asyncio.shield(in_flight)
+
+    async def _build(self, key, build):
+        try:
+            body = encode_json(await build())
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        self._entries[key] = (body, time.monotonic() + self.ttl_seconds)
+        return body
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'entries': len(self._entries),
+            'in_flight': len(self._in_flight),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
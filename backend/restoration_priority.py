@@ -3,6 +3,7 @@ ElectroWizard - Restoration Priority Algorithm
 Intelligent prioritization for power restoration
 """
 
+import numpy as np
 import pandas as pd
 from typing import List, Dict
 from datetime import datetime, timedelta
@@ -27,6 +28,13 @@ class RestorationPrioritizer:
         'low': 1.0        # < 1 hour
     }
     
+    PRIORITY_CATEGORIES = {
+        1: 'Critical - Healthcare',
+        2: 'High - Industrial',
+        3: 'Medium - Educational',
+        4: 'Standard - Residential'
+    }
+    
     def __init__(self):
         self.restoration_queue = []
     
@@ -108,83 +116,94 @@ class RestorationPrioritizer:
         """Generate detailed restoration plan"""
         
         # Group zones by priority level
-        critical_zones = [z for z in prioritized_zones if z['priority_level'] == 1]
-        high_zones = [z for z in prioritized_zones if z['priority_level'] == 2]
-        medium_zones = [z for z in prioritized_zones if z['priority_level'] == 3]
-        standard_zones = [z for z in prioritized_zones if z['priority_level'] == 4]
+        phase_zones = {
+            level: [z for z in prioritized_zones if z['priority_level'] == level]
+            for level in self.PRIORITY_CATEGORIES
+        }
+        
+        return self._build_plan(
+            len(prioritized_zones),
+            {level: len(zones) for level, zones in phase_zones.items()},
+            {level: zones[:10] for level, zones in phase_zones.items()},  # Top 10 for display
+            available_crews
+        )
+    
+    def _build_plan(self, total_zones: int, phase_counts: Dict[int, int],
+                    phase_zones: Dict[int, List[Dict]], available_crews: int) -> Dict:
+        """Plan body from zone counts and display zones per priority level"""
         
         # Estimate restoration time (assuming 1 hour per crew per zone)
-        def estimate_completion_time(zones_list, start_hour):
-            if not zones_list:
+        def estimate_completion_time(zone_count, start_hour):
+            if not zone_count:
                 return start_hour
-            batches = len(zones_list) // available_crews + (1 if len(zones_list) % available_crews else 0)
+            batches = zone_count // available_crews + (1 if zone_count % available_crews else 0)
             return start_hour + batches
         
         current_time = 0
-        critical_complete = estimate_completion_time(critical_zones, current_time)
-        high_complete = estimate_completion_time(high_zones, critical_complete)
-        medium_complete = estimate_completion_time(medium_zones, high_complete)
-        standard_complete = estimate_completion_time(standard_zones, medium_complete)
+        critical_complete = estimate_completion_time(phase_counts[1], current_time)
+        high_complete = estimate_completion_time(phase_counts[2], critical_complete)
+        medium_complete = estimate_completion_time(phase_counts[3], high_complete)
+        standard_complete = estimate_completion_time(phase_counts[4], medium_complete)
         
         plan = {
-            'total_zones': len(prioritized_zones),
+            'total_zones': total_zones,
             'available_crews': available_crews,
             'estimated_total_hours': standard_complete,
             'phases': [
                 {
                     'phase': 'Phase 1 - Critical (Healthcare)',
-                    'zone_count': len(critical_zones),
+                    'zone_count': phase_counts[1],
                     'estimated_hours': critical_complete,
-                    'zones': critical_zones[:10]  # Top 10 for display
+                    'zones': phase_zones[1]
                 },
                 {
                     'phase': 'Phase 2 - High Priority (Industrial)',
-                    'zone_count': len(high_zones),
+                    'zone_count': phase_counts[2],
                     'estimated_hours': high_complete - critical_complete,
-                    'zones': high_zones[:10]
+                    'zones': phase_zones[2]
                 },
                 {
                     'phase': 'Phase 3 - Medium Priority (Educational)',
-                    'zone_count': len(medium_zones),
+                    'zone_count': phase_counts[3],
                     'estimated_hours': medium_complete - high_complete,
-                    'zones': medium_zones[:10]
+                    'zones': phase_zones[3]
                 },
                 {
                     'phase': 'Phase 4 - Standard (Residential)',
-                    'zone_count': len(standard_zones),
+                    'zone_count': phase_counts[4],
                     'estimated_hours': standard_complete - medium_complete,
-                    'zones': standard_zones[:10]
+                    'zones': phase_zones[4]
                 }
             ],
             'recommendations': self._generate_recommendations(
-                critical_zones, high_zones, available_crews
+                phase_counts[1], phase_counts[2], available_crews
             )
         }
         
         return plan
     
-    def _generate_recommendations(self, critical_zones, high_zones, crews):
+    def _generate_recommendations(self, critical_count, high_count, crews):
         """Generate actionable recommendations"""
         recommendations = []
         
-        if len(critical_zones) > crews:
+        if critical_count > crews:
             recommendations.append({
                 'type': 'urgent',
-                'message': f'⚠️ {len(critical_zones)} critical healthcare zones affected. Consider deploying additional crews.',
-                'action': f'Request {len(critical_zones) - crews} additional emergency crews'
+                'message': f'⚠️ {critical_count} critical healthcare zones affected. Consider deploying additional crews.',
+                'action': f'Request {critical_count - crews} additional emergency crews'
             })
         
-        if len(critical_zones) > 0:
+        if critical_count > 0:
             recommendations.append({
                 'type': 'priority',
-                'message': f'🏥 {len(critical_zones)} hospitals without power. Immediate action required.',
+                'message': f'🏥 {critical_count} hospitals without power. Immediate action required.',
                 'action': 'Deploy all available crews to healthcare facilities first'
             })
         
-        if len(high_zones) > 10:
+        if high_count > 10:
             recommendations.append({
                 'type': 'economic',
-                'message': f'🏭 {len(high_zones)} industrial zones affected. Significant economic impact expected.',
+                'message': f'🏭 {high_count} industrial zones affected. Significant economic impact expected.',
                 'action': 'Coordinate with industrial liaison for backup power arrangements'
             })
         
@@ -209,6 +228,11 @@ class RestorationPrioritizer:
         
         zone = prioritized_zones[zone_index]
         
+        return self._zone_eta(zone_id, zone_index, zone['priority_category'],
+                              zone['priority_score'], available_crews)
+    
+    def _zone_eta(self, zone_id: str, zone_index: int, priority_category: str,
+                  priority_score: float, available_crews: int) -> Dict:
         # Calculate ETA based on position
         batch_number = zone_index // available_crews + 1
         eta_hours = batch_number
@@ -216,11 +240,128 @@ class RestorationPrioritizer:
         return {
             'zone_id': zone_id,
             'position_in_queue': zone_index + 1,
-            'priority_category': zone['priority_category'],
+            'priority_category': priority_category,
             'estimated_hours': eta_hours,
             'estimated_completion': f"{eta_hours} hours from restoration start",
-            'priority_score': zone['priority_score']
+            'priority_score': priority_score
         }
+    
+    # Columnar path: the same scores and levels as NumPy array operations over
+    # a zone frame, so only the zones actually returned become dicts
+    
+    def _column(self, zones: pd.DataFrame, column: str) -> np.ndarray:
+        # Missing columns count as 0, like dict.get(column, 0)
+        if column not in zones.columns:
+            return np.zeros(len(zones))
+        return zones[column].to_numpy(dtype=np.float64)
+    
+    def score_frame(self, zones: pd.DataFrame):
+        """(priority scores, priority levels) arrays for every row of a zone frame"""
+        weights = self.PRIORITY_WEIGHTS
+        score = (
+            self._column(zones, 'hospital_count') * weights['hospital']
+            + self._column(zones, 'industry_count') * weights['industry']
+            + self._column(zones, 'school_count') * weights['school']
+            + self._column(zones, 'atm_count') * weights['atm']
+            + self._column(zones, 'population_density') / 100 * weights['residential']
+        )
+        
+        duration = self._column(zones, 'outage_duration_hours')
+        score *= np.select(
+            [duration > 6, duration > 3, duration > 1],
+            [self.DURATION_MULTIPLIERS['critical'], self.DURATION_MULTIPLIERS['high'],
+             self.DURATION_MULTIPLIERS['medium']],
+            self.DURATION_MULTIPLIERS['low']
+        )
+        score *= np.where(self._column(zones, 'is_peak_hour') == 1, 1.5, 1.0)
+        score += self._column(zones, 'impact_score') * 10
+        
+        risk_level = zones['risk_level'] if 'risk_level' in zones.columns else pd.Series('Low', index=zones.index)
+        levels = np.select(
+            [
+                ((risk_level == 'Critical').to_numpy() | (self._column(zones, 'hospital_count') >= 10)),
+                ((risk_level == 'High').to_numpy() | (self._column(zones, 'industry_count') >= 8)),
+                ((risk_level == 'Medium').to_numpy() | (self._column(zones, 'school_count') >= 15))
+            ],
+            [1, 2, 3],
+            4
+        )
+        
+        return np.round(score, 2), levels
+    
+    @staticmethod
+    def top_k(scores: np.ndarray, k: int, candidates=None) -> np.ndarray:
+        """Positions of the k highest scores (among candidates), highest first
+        
+        argpartition finds them in O(n) and only the k winners are sorted.
+        Equal scores keep row order, as the stable sort in prioritize_zones does.
+        """
+        positions = np.arange(len(scores)) if candidates is None else np.asarray(candidates)
+        values = scores[positions]
+        k = min(k, len(positions))
+        if k <= 0:
+            return positions[:0]
+        
+        if k < len(positions):
+            kth = values[np.argpartition(-values, k - 1)[k - 1]]
+            above = np.flatnonzero(values > kth)
+            ties = np.flatnonzero(values == kth)[:k - len(above)]
+            selected = np.concatenate([above, ties])
+        else:
+            selected = np.arange(len(positions))
+        
+        selected = selected[np.lexsort((selected, -values[selected]))]
+        return positions[selected]
+    
+    def _priority_records(self, zones: pd.DataFrame, positions: np.ndarray,
+                          scores: np.ndarray, levels: np.ndarray) -> List[Dict]:
+        return [
+            {
+                **zone,
+                'priority_score': float(scores[position]),
+                'priority_category': self.PRIORITY_CATEGORIES[int(levels[position])],
+                'priority_level': int(levels[position])
+            }
+            for zone, position in zip(zones.iloc[positions].to_dict('records'), positions)
+        ]
+    
+    def prioritize_frame(self, zones: pd.DataFrame, top_k: int = 10) -> List[Dict]:
+        """The first top_k records prioritize_zones would return, from a zone frame"""
+        scores, levels = self.score_frame(zones)
+        return self._priority_records(zones, self.top_k(scores, top_k), scores, levels)
+    
+    def generate_restoration_plan_frame(self, zones: pd.DataFrame,
+                                        available_crews: int = 5) -> Dict:
+        """generate_restoration_plan for a zone frame, without per-zone dicts or a full sort"""
+        scores, levels = self.score_frame(zones)
+        counts = np.bincount(levels, minlength=len(self.PRIORITY_CATEGORIES) + 1)
+        
+        top = {level: self.top_k(scores, 10, np.flatnonzero(levels == level)) for level in self.PRIORITY_CATEGORIES}
+        # One row selection for every phase's display zones, then split back per phase
+        records = iter(self._priority_records(zones, np.concatenate(list(top.values())), scores, levels))
+        
+        return self._build_plan(
+            len(zones),
+            {level: int(counts[level]) for level in self.PRIORITY_CATEGORIES},
+            {level: [next(records) for _ in positions] for level, positions in top.items()},
+            available_crews
+        )
+    
+    def get_zone_eta_frame(self, zone_id: str, zones: pd.DataFrame,
+                           available_crews: int = 5) -> Dict:
+        """get_zone_eta for a zone frame: the queue position is counted, not sorted for"""
+        matches = np.flatnonzero((zones['zone_id'] == zone_id).to_numpy())
+        if not len(matches):
+            return {'error': 'Zone not found'}
+        
+        scores, levels = self.score_frame(zones)
+        position = self.top_k(scores, 1, matches)[0]
+        score = scores[position]
+        # Zones ahead in the queue: higher scores, plus equal scores earlier in row order
+        zone_index = int((scores > score).sum() + (scores[:position] == score).sum())
+        
+        return self._zone_eta(zone_id, zone_index, self.PRIORITY_CATEGORIES[int(levels[position])],
+                              float(score), available_crews)
 
 # Initialize global prioritizer
 prioritizer = RestorationPrioritizer()
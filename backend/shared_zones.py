@@ -0,0 +1,305 @@
+"""
+ElectroWizard - Shared Zones Module
+Read-only, memory-mapped zone table and feature matrix that every uvicorn
+worker maps zero-copy, published as numbered generations behind an atomic
+CURRENT pointer so a refresh swaps all workers to the new data
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+# Unset: every worker keeps its own in-memory copy (the default)
+SHARED_ZONES_DIR = os.getenv('SHARED_ZONES_DIR')
+POLL_SECONDS = float(os.getenv('SHARED_ZONES_POLL_SECONDS', '5'))
+
+# Older generations are kept so a worker still mapping one is not cut off mid-swap
+KEEP_GENERATIONS = 2
+
+GENERATION_PREFIX = 'gen-'
+FEATURES_FILE = 'features.npy'
+STRINGS_FILE = 'strings.arrow'
+
+# Text columns with at most this many distinct values are stored as codes with
+# their vocabulary in meta.json; larger ones (zone_id) as mapped Arrow strings
+MAX_META_VOCABULARY = 256
+
+
+class SharedZones:
+    """One attached generation: a DataFrame whose columns are views of mapped files"""
+
+    def __init__(self, root, generation, df, features, meta):
+        self.root = root
+        self.generation = generation
+        self.df = df
+        self.features = features
+        self.meta = meta
+
+    def features_for(self, feature_cols):
+        """The shared feature matrix, if it was written for these feature columns"""
+        if self.features is not None and self.meta.get('feature_cols') == list(feature_cols):
+            return self.features
+        return None
+
+    def info(self, load_ms):
+        return {
+            'source': 'shared',
+            'path': os.path.join(self.root, self.generation),
+            'generation': self.generation,
+            'model_version': self.meta.get('model_version'),
+            'rows': len(self.df),
+            'load_ms': load_ms,
+            'memory_mb': self.df.memory_usage(deep=True).sum() / 1e6
+        }
+
+
+@contextmanager
+def _publish_lock(root):
+    """Serialize publishers (workers bootstrapping at once, the CLI) on a lock file"""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, '.lock'), 'w') as lock_file:
+        try:
+            import fcntl
+        except ImportError:
+            # No flock (Windows): a single publisher is assumed
+            yield
+            return
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def list_generations(root):
+    """Complete generations (those with a meta.json), oldest first"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if name.startswith(GENERATION_PREFIX) and os.path.exists(os.path.join(root, name, 'meta.json'))
+    )
+
+
+def current_generation(root):
+    path = os.path.join(root, 'CURRENT')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        generation = f.read().strip()
+    return generation if os.path.exists(os.path.join(root, generation, 'meta.json')) else None
+
+
+def _set_current(root, generation):
+    tmp_path = os.path.join(root, 'CURRENT.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(generation)
+    os.replace(tmp_path, os.path.join(root, 'CURRENT'))
+
+
+def _write_columns(df, directory):
+    """One .npy per numeric column, codes for low-cardinality labels, Arrow for the rest
+
+    High-cardinality strings go to one uncompressed Arrow IPC file that
+    workers memory-map, so their UTF-8 data is shared instead of parsed
+    into per-process Python strings.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        pa = None  # no Arrow: every text column is stored as codes
+
+    columns = []
+    strings = {}
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        file_name = f'col_{i:03d}.npy'
+        if pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(directory, file_name), values.to_numpy())
+            columns.append({'name': column, 'file': file_name, 'kind': 'numeric'})
+            continue
+
+        categorical = values if isinstance(values.dtype, pd.CategoricalDtype) else None
+        if categorical is None and (pa is None or values.nunique() <= MAX_META_VOCABULARY):
+            categorical = values.astype('category')
+        if categorical is not None and (pa is None or len(categorical.cat.categories) <= MAX_META_VOCABULARY):
+            np.save(os.path.join(directory, file_name), categorical.cat.codes.to_numpy())
+            columns.append({
+                'name': column, 'file': file_name, 'kind': 'category',
+                'categories': [str(category) for category in categorical.cat.categories]
+            })
+        else:
+            strings[column] = pa.array(values.astype(str).where(values.notna()), type=pa.large_string(), from_pandas=True)
+            columns.append({'name': column, 'file': STRINGS_FILE, 'kind': 'string'})
+
+    if strings:
+        table = pa.table(strings)
+        with pa.OSFile(os.path.join(directory, STRINGS_FILE), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    return columns
+
+
+def _read_strings(directory):
+    """The Arrow string table of a generation, its buffers pointing into the mapped file"""
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(os.path.join(directory, STRINGS_FILE), 'r')).read_all()
+
+
+def _string_array(chunked):
+    """Wrap mapped Arrow strings as a pandas array without copying them"""
+    try:
+        dtype = pd.StringDtype('pyarrow', na_value=np.nan)  # the default str dtype
+    except TypeError:
+        return pd.arrays.ArrowExtensionArray(chunked)  # pandas without na_value
+    return pd.array(chunked, dtype=dtype)
+
+
+def _publish(df, root, feature_cols, model_version):
+    """Write a new generation and point CURRENT at it (caller holds the lock)"""
+    generations = list_generations(root)
+    number = int(generations[-1][len(GENERATION_PREFIX):]) + 1 if generations else 1
+    generation = f'{GENERATION_PREFIX}{number:06d}'
+    tmp_dir = os.path.join(root, f'.{generation}.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    meta = {
+        'generation': generation,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rows': len(df),
+        'columns': _write_columns(df, tmp_dir),
+        'feature_cols': list(feature_cols) if feature_cols is not None else None,
+        'model_version': model_version
+    }
+    if feature_cols is not None:
+        features = np.ascontiguousarray(df[list(feature_cols)].to_numpy(dtype=np.float64))
+        np.save(os.path.join(tmp_dir, FEATURES_FILE), features)
+
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_dir, os.path.join(root, generation))
+    _set_current(root, generation)
+
+    # Unlinking a mapped file is safe on POSIX: existing maps stay valid
+    for old in list_generations(root)[:-KEEP_GENERATIONS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+    print(f"🗂️ Published shared zone generation {generation} ({len(df):,} rows) to {root}/")
+    return generation
+
+
+def publish_generation(df, root=SHARED_ZONES_DIR, feature_cols=None, model_version=None):
+    """Write df (and its feature matrix) as a new generation and make it CURRENT
+
+    Files go to a temporary directory that is renamed into place, and
+    CURRENT is replaced last, so workers only ever see complete generations.
+    Returns the generation name.
+    """
+    with _publish_lock(root):
+        return _publish(df, root, feature_cols, model_version)
+
+
+def attach(root=SHARED_ZONES_DIR, generation=None):
+    """Map a generation (CURRENT by default) read-only; None if there is none yet"""
+    generation = generation or current_generation(root)
+    if generation is None:
+        return None
+
+    directory = os.path.join(root, generation)
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+
+    columns = {}
+    strings = None
+    for column in meta['columns']:
+        if column['kind'] == 'string':
+            strings = strings if strings is not None else _read_strings(directory)
+            columns[column['name']] = _string_array(strings.column(column['name']))
+            continue
+        values = np.load(os.path.join(directory, column['file']), mmap_mode='r')
+        if column['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=column['categories'])
+        columns[column['name']] = values
+
+    # copy=False keeps every column a view of its mapping
+    df = pd.DataFrame(columns, copy=False)
+    features_path = os.path.join(directory, FEATURES_FILE)
+    features = np.load(features_path, mmap_mode='r') if os.path.exists(features_path) else None
+    return SharedZones(root, generation, df, features, meta)
+
+
+def attach_or_publish(build, root=SHARED_ZONES_DIR):
+    """Attach CURRENT, or have the first worker in publish one from build()
+
+    build() returns (df, feature_cols, model_version), or None when there is
+    no data to publish.
+    """
+    shared = attach(root)
+    if shared is not None:
+        return shared
+
+    with _publish_lock(root):
+        # Another worker may have published while this one waited on the lock
+        if current_generation(root) is None:
+            built = build()
+            if built is None:
+                return None
+            df, feature_cols, model_version = built
+            _publish(df, root, feature_cols, model_version)
+    return attach(root)
+
+
+def build_from_store():
+    """Zone store frame scored by the registry's CURRENT (or models/) predictor"""
+    from zone_store import load_zones
+    from model_registry import ModelRegistry
+    from ml_models import PowerOutagePredictor
+    from prediction_table import attach_prediction_table
+    from model_artifacts import fast_artifacts_available
+
+    df, _ = load_zones()
+    if df is None:
+        return None
+
+    registry = ModelRegistry()
+    version = registry.current_version()
+    if version is not None:
+        predictor = registry.load_predictor(version)
+    elif os.path.exists('models/xgb_model.pkl') or fast_artifacts_available('models'):
+        predictor = PowerOutagePredictor()
+        predictor.load_models()
+    else:
+        return df, None, None
+
+    predictor.ensure_cluster_assigner(df)
+    attach_prediction_table(predictor, df)
+    return df, predictor.feature_cols, predictor.version or 'local'
+
+
+def main():
+    """python shared_zones.py publish | status: refresh the generation workers map"""
+    root = SHARED_ZONES_DIR or 'shared_zones'
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    if command == 'publish':
+        built = build_from_store()
+        if built is None:
+            print("⚠️ Dataset not found. Run dataset_generator.py first.")
+            return
+        df, feature_cols, model_version = built
+        publish_generation(df, root, feature_cols, model_version)
+    else:
+        print(f"📂 {root}: CURRENT = {current_generation(root)}")
+        for generation in list_generations(root):
+            print(f"   {generation}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+ElectroWizard - Spatial Index Module
+Grid and haversine BallTree indexes over zone coordinates for bounding-box,
+radius and k-nearest queries in time proportional to the result
+"""
+
+import threading
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# ~1.1 km cells at Chennai's latitude: a map viewport covers a handful of rows
+GRID_CELL_DEGREES = 0.01
+MAX_GRID_CELLS = 1_000_000
+
+
+class SpatialIndex:
+    """Spatial lookups over the dataset's latitude/longitude columns
+
+    Bounding boxes use a uniform lat/lon grid stored CSR-style (positions
+    sorted by cell id, as in ClusterIndex), so a box reads one contiguous
+    slice per grid row it spans. Radius and nearest queries use a haversine
+    BallTree, built on the first such query so startup never imports
+    sklearn.neighbors. Rows without coordinates are not indexed.
+    """
+
+    def __init__(self, latitudes, longitudes, cell_degrees=GRID_CELL_DEGREES):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        self._positions = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+        self._lat = latitudes[self._positions]
+        self._lon = longitudes[self._positions]
+
+        # Grid over the data's extent, coarsened so it never exceeds MAX_GRID_CELLS
+        self._lat_min = self._lat.min() if len(self._lat) else 0.0
+        self._lon_min = self._lon.min() if len(self._lon) else 0.0
+        if len(self._lat):
+            area = (self._lat.max() - self._lat_min + cell_degrees) * (self._lon.max() - self._lon_min + cell_degrees)
+            cell_degrees = max(cell_degrees, float(np.sqrt(area / MAX_GRID_CELLS)))
+        self.cell_degrees = cell_degrees
+        self._n_rows = int((self._lat.max() - self._lat_min) // cell_degrees) + 1 if len(self._lat) else 1
+        self._n_cols = int((self._lon.max() - self._lon_min) // cell_degrees) + 1 if len(self._lon) else 1
+        cells = self._cell_row(self._lat) * self._n_cols + self._cell_col(self._lon)
+        self._order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=self._n_rows * self._n_cols)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        self._ball_tree = None
+        self._tree_lock = threading.Lock()
+
+    @property
+    def _tree(self):
+        """Haversine BallTree, built once by whichever query needs it first"""
+        tree = self._ball_tree
+        if tree is None:
+            with self._tree_lock:
+                if self._ball_tree is None:
+                    from sklearn.neighbors import BallTree
+
+                    coordinates = np.radians(np.column_stack([self._lat, self._lon]))
+                    self._ball_tree = BallTree(coordinates, metric='haversine')
+                tree = self._ball_tree
+        return tree
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _cell_row(self, lat):
+        return np.clip(((lat - self._lat_min) // self.cell_degrees).astype(np.int64), 0, self._n_rows - 1)
+
+    def _cell_col(self, lon):
+        return np.clip(((lon - self._lon_min) // self.cell_degrees).astype(np.int64), 0, self._n_cols - 1)
+
+    def bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Dataset positions inside the box (inclusive), ascending"""
+        if not len(self._positions) or min_lat > max_lat or min_lon > max_lon:
+            return self._positions[:0]
+
+        row_lo, row_hi = self._cell_row(np.array([min_lat, max_lat]))
+        col_lo, col_hi = self._cell_col(np.array([min_lon, max_lon]))
+        # Cells of one grid row are contiguous in the CSR order
+        candidates = np.concatenate([
+            self._order[self._offsets[row * self._n_cols + col_lo]:self._offsets[row * self._n_cols + col_hi + 1]]
+            for row in range(row_lo, row_hi + 1)
+        ])
+
+        lat, lon = self._lat[candidates], self._lon[candidates]
+        inside = (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+        return np.sort(self._positions[candidates[inside]])
+
+    def near(self, lat, lon, radius_km):
+        """(positions, distances_km) within radius_km of the point, nearest first"""
+        if not len(self._positions):
+            return self._positions[:0], np.zeros(0)
+        indices, distances = self._tree.query_radius(
+            np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
+        )
+        return self._positions[indices[0]], distances[0] * EARTH_RADIUS_KM
+
+    def nearest(self, lat, lon, k):
+        """(positions, distances_km) of the k zones nearest to the point"""
+        k = min(k, len(self._positions))
+        if k == 0:
+            return self._positions[:0], np.zeros(0)
+        distances, indices = self._tree.query(np.radians([[lat, lon]]), k=k)
+        return self._positions[indices[0]], distances[0] * EARTH_RADIUS_KM
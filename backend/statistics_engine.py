@@ -0,0 +1,147 @@
+"""
+ElectroWizard - Statistics Engine Module
+Running city and per-district aggregates behind /api/stats, built once
+from the dataset and then updated per changed zone instead of rescanned
+"""
+
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from zone_store import RISK_LEVELS
+
+# Zone count columns summed per district (column -> /api/stats key)
+COUNT_COLUMNS = {
+    'hospital_count': 'total_hospitals',
+    'industry_count': 'total_industries',
+    'population_density': 'total_population_affected'
+}
+
+
+def _ranked(counts):
+    """{label: count} for non-zero counts, largest first (value_counts order)"""
+    return {label: int(count) for label, count in sorted(counts.items(), key=lambda item: -item[1]) if count > 0}
+
+
+class StatisticsEngine:
+    """Aggregates for one impact source (stored or model columns)
+
+    Per district it holds the zone count, impact sum, COUNT_COLUMNS sums and
+    a risk-level histogram as arrays indexed by district code. rebuild() is
+    a single vectorized pass; update() subtracts the old values of changed
+    zones and adds their new ones, O(1) per zone plus O(districts) per
+    batch. snapshot() costs O(districts) whatever the zone count.
+    """
+
+    def __init__(self, source, impact_column, risk_column):
+        self.source = source
+        self.impact_column = impact_column
+        self.risk_column = risk_column
+        self.columns = ['district', impact_column, risk_column, *COUNT_COLUMNS]
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.updates = 0
+        self.rebuild_ms = 0.0
+
+    def rebuild(self, df):
+        start = time.perf_counter()
+        districts = sorted(str(district) for district in pd.unique(df['district'].dropna()))
+        codes = {district: i for i, district in enumerate(districts)}
+        arrays = {
+            'count': np.zeros(len(districts), dtype=np.int64),
+            'impact_sum': np.zeros(len(districts), dtype=np.float64),
+            'risk': np.zeros((len(districts), len(RISK_LEVELS)), dtype=np.int64),
+            **{column: np.zeros(len(districts), dtype=np.int64) for column in COUNT_COLUMNS}
+        }
+        self._accumulate(arrays, codes, df, 1)
+
+        with self._lock:
+            self._districts, self._codes, self._arrays = districts, codes, arrays
+        self.rebuilds += 1
+        self.rebuild_ms = (time.perf_counter() - start) * 1000
+
+    def _accumulate(self, arrays, codes, rows, sign):
+        """Add (sign=1) or remove (sign=-1) rows' contributions"""
+        rows = rows[rows['district'].notna()]
+        if len(rows) == 0:
+            return
+
+        row_codes, uniques = pd.factorize(rows['district'])
+        for district in (str(district) for district in uniques):
+            if district not in codes:
+                # A district not seen at rebuild: grow every array by one row
+                codes[district] = len(codes)
+                for name, array in arrays.items():
+                    arrays[name] = np.concatenate([array, np.zeros((1, *array.shape[1:]), dtype=array.dtype)])
+        row_codes = np.array([codes[str(district)] for district in uniques], dtype=np.int64)[row_codes]
+        n = len(codes)
+
+        arrays['count'] += sign * np.bincount(row_codes, minlength=n)
+        arrays['impact_sum'] += sign * np.bincount(
+            row_codes, weights=rows[self.impact_column].to_numpy(dtype=np.float64), minlength=n
+        )
+        for column in COUNT_COLUMNS:
+            sums = np.bincount(row_codes, weights=rows[column].to_numpy(dtype=np.float64), minlength=n)
+            arrays[column] += sign * np.rint(sums).astype(np.int64)
+
+        risk_codes = pd.Categorical(rows[self.risk_column], categories=RISK_LEVELS).codes
+        known = risk_codes >= 0
+        risk = np.bincount(row_codes[known] * len(RISK_LEVELS) + risk_codes[known], minlength=n * len(RISK_LEVELS))
+        arrays['risk'] += sign * risk.reshape(n, len(RISK_LEVELS))
+
+    def update(self, before, after):
+        """Replace changed zones' old values (before) with their new ones (after)
+
+        Both frames hold the same zones; the cost depends only on their size.
+        """
+        with self._lock:
+            self._accumulate(self._arrays, self._codes, before, -1)
+            self._accumulate(self._arrays, self._codes, after, 1)
+            if len(self._codes) != len(self._districts):
+                self._districts = sorted(self._codes, key=self._codes.get)
+        self.updates += 1
+
+    def risk_counts(self):
+        """(total zones, {risk level: zones}) for the whole city"""
+        with self._lock:
+            total = int(self._arrays['count'].sum())
+            risk_totals = self._arrays['risk'].sum(axis=0)
+        return total, {level: int(count) for level, count in zip(RISK_LEVELS, risk_totals)}
+
+    def snapshot(self):
+        """The /api/stats body from the running aggregates"""
+        with self._lock:
+            districts, arrays = self._districts, {name: array.copy() for name, array in self._arrays.items()}
+
+        count = arrays['count']
+        total = int(count.sum())
+        risk_totals = arrays['risk'].sum(axis=0)
+        return {
+            "source": self.source,
+            "total_zones": total,
+            "risk_distribution": _ranked(dict(zip(RISK_LEVELS, risk_totals))),
+            "district_distribution": _ranked(dict(zip(districts, count))),
+            "average_impact_score": float(arrays['impact_sum'].sum() / total) if total else 0.0,
+            **{key: int(arrays[column].sum()) for column, key in COUNT_COLUMNS.items()},
+            "critical_zones": int(risk_totals[RISK_LEVELS.index('Critical')]),
+            "high_risk_zones": int(risk_totals[RISK_LEVELS.index('High')]),
+            "districts": {
+                district: {
+                    "total_zones": int(count[i]),
+                    "avg_impact": float(arrays['impact_sum'][i] / count[i]),
+                    "risk_breakdown": _ranked(dict(zip(RISK_LEVELS, arrays['risk'][i])))
+                }
+                for district, i in sorted((district, i) for i, district in enumerate(districts))
+                if count[i] > 0
+            }
+        }
+
+    def stats(self):
+        return {
+            'source': self.source,
+            'districts': len(self._districts),
+            'rebuilds': self.rebuilds,
+            'updates': self.updates,
+            'rebuild_ms': self.rebuild_ms
+        }
@@ -0,0 +1,309 @@
+"""
+ElectroWizard - Streaming Training Module
+Out-of-core training for histories that do not fit in memory: CSV, Parquet
+or sharded datasets are read in chunks, XGBoost trains from a quantile data
+iterator, the classifiers train on reservoir samples and K-Means / the
+scalers use partial_fit
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMNS = ['impact_score', 'risk_level']
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def iter_chunks(path, columns, chunk_rows=250_000):
+    """Yield DataFrames of at most chunk_rows rows from a CSV, Parquet or Arrow
+    file, or from a sharded dataset directory written by dataset_generator"""
+    if os.path.isdir(path):
+        from dataset_generator import load_shard_manifest
+
+        for shard in load_shard_manifest(path)['shards']:
+            yield from iter_chunks(os.path.join(path, shard['file']), columns, chunk_rows)
+    elif path.endswith('.arrow'):
+        import pyarrow.feather as feather
+
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        for batch in table.to_batches(max_chunksize=chunk_rows):
+            yield batch.to_pandas()
+    elif path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
+
+
+class Reservoir:
+    """Fixed-size uniform sample over a stream of row blocks
+
+    Every row gets a random key and the `capacity` smallest keys are kept,
+    which is a uniform sample without replacement and merges block-wise with
+    one argpartition per chunk instead of a Python loop per row.
+    """
+
+    def __init__(self, capacity, seed=42):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.columns = None
+        self.rows_seen = 0
+
+    def add(self, *columns):
+        n_rows = len(columns[0])
+        self.rows_seen += n_rows
+        keys = self.rng.random(n_rows)
+
+        if self.columns is None:
+            self.keys, self.columns = keys, list(columns)
+        else:
+            self.keys = np.concatenate([self.keys, keys])
+            self.columns = [np.concatenate([kept, new]) for kept, new in zip(self.columns, columns)]
+
+        if len(self.keys) > self.capacity:
+            keep = np.argpartition(self.keys, self.capacity)[:self.capacity]
+            self.keys = self.keys[keep]
+            self.columns = [column[keep] for column in self.columns]
+
+    def arrays(self):
+        return self.columns
+
+
+class StreamingTrainer:
+    """Chunked, bounded-memory counterpart of PowerOutagePredictor.train_models()
+
+    Peak memory is set by chunk_rows, sample_rows and test_rows rather than the
+    input size. With external_memory=True XGBoost pages its quantised matrix
+    to disk (ExtMemQuantileDMatrix); otherwise it keeps the compressed
+    QuantileDMatrix in memory, roughly one byte per feature per row.
+    """
+
+    def __init__(self, predictor, path, chunk_rows=250_000, sample_rows=500_000, test_rows=200_000,
+                 test_fraction=0.2, external_memory=False, cache_dir=None, seed=42):
+        self.predictor = predictor
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.sample_rows = sample_rows
+        self.test_rows = test_rows
+        self.test_fraction = test_fraction
+        self.external_memory = external_memory
+        self.cache_dir = cache_dir
+        self.seed = seed
+
+        if 'weather_encoded' not in predictor.feature_cols:
+            predictor.feature_cols.append('weather_encoded')
+        self.feature_cols = list(predictor.feature_cols)
+        self.cluster_idx = [self.feature_cols.index(col) for col in predictor.CLUSTER_FEATURES]
+        self.timings = {}
+        self.rows_seen = 0
+
+    def chunks(self):
+        """Yield (X, y_impact, y_risk, is_test) per chunk; the split is the same on every pass"""
+        read_columns = [col for col in self.feature_cols if col != 'weather_encoded']
+        read_columns += ['weather_condition'] + TARGET_COLUMNS
+
+        for chunk_index, chunk in enumerate(iter_chunks(self.path, read_columns, self.chunk_rows)):
+            self.predictor.encode_columns(chunk)
+            # Seeding by chunk index keeps the train/test split stable across passes
+            is_test = np.random.default_rng([self.seed, chunk_index]).random(len(chunk)) < self.test_fraction
+            yield (
+                chunk[self.feature_cols].to_numpy(dtype=np.float64),
+                chunk['impact_score'].to_numpy(dtype=np.float64),
+                chunk['risk_encoded'].to_numpy(dtype=np.int64),
+                is_test
+            )
+
+    def _timed(self, name, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.timings[name] = time.perf_counter() - start
+        return result
+
+    def _scan(self):
+        """Pass 1: scaler statistics plus the train and test reservoirs"""
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        cluster_scaler = StandardScaler()
+        train_sample = Reservoir(self.sample_rows, self.seed)
+        test_sample = Reservoir(self.test_rows, self.seed + 1)
+
+        for X, y_impact, y_risk, is_test in self.chunks():
+            train = ~is_test
+            if train.any():
+                scaler.partial_fit(pd.DataFrame(X[train], columns=self.feature_cols))
+                train_sample.add(X[train], y_impact[train], y_risk[train])
+            if is_test.any():
+                test_sample.add(X[is_test], y_impact[is_test], y_risk[is_test])
+            # K-Means was always fitted on every row, not just the train split
+            cluster_scaler.partial_fit(X[:, self.cluster_idx])
+
+        return scaler, cluster_scaler, train_sample, test_sample
+
+    def _train_xgb(self, n_jobs):
+        import xgboost as xgb
+
+        trainer = self
+
+        class ChunkIter(xgb.DataIter):
+            def __init__(self, cache_prefix):
+                self._chunks = None
+                super().__init__(cache_prefix=cache_prefix)
+
+            def next(self, input_data):
+                if self._chunks is None:
+                    self._chunks = trainer.chunks()
+                for X, y_impact, _, is_test in self._chunks:
+                    train = ~is_test
+                    if train.any():
+                        input_data(data=X[train], label=y_impact[train], feature_names=trainer.feature_cols)
+                        return True
+                return False
+
+            def reset(self):
+                self._chunks = None
+
+        params = self.predictor.MODEL_PARAMS['xgb_model']
+        booster_params = {
+            'objective': 'reg:squarederror',
+            'tree_method': 'hist',
+            'max_depth': params['max_depth'],
+            'eta': params['learning_rate'],
+            'subsample': params['subsample'],
+            'colsample_bytree': params['colsample_bytree'],
+            'seed': params['random_state'],
+            'nthread': n_jobs
+        }
+
+        with tempfile.TemporaryDirectory(prefix='electrowizard-xgb-', dir=self.cache_dir) as cache:
+            if self.external_memory and not hasattr(xgb, 'ExtMemQuantileDMatrix'):
+                print("   ⚠️ External memory needs xgboost>=3.0, using the in-memory QuantileDMatrix")
+            if self.external_memory and hasattr(xgb, 'ExtMemQuantileDMatrix'):
+                dtrain = xgb.ExtMemQuantileDMatrix(ChunkIter(os.path.join(cache, 'cache')), nthread=n_jobs)
+            else:
+                dtrain = xgb.QuantileDMatrix(ChunkIter(None), nthread=n_jobs)
+            booster = xgb.train(booster_params, dtrain, num_boost_round=params['n_estimators'])
+            del dtrain
+
+        # Hand the booster to the sklearn wrapper so serving code is unchanged
+        model = xgb.XGBRegressor(**params)
+        model.load_model(bytearray(booster.save_raw(raw_format='ubj')))
+        return model
+
+    def _train_kmeans(self, cluster_scaler):
+        from sklearn.cluster import MiniBatchKMeans
+
+        params = self.predictor.MODEL_PARAMS['kmeans_model']
+        kmeans = MiniBatchKMeans(
+            n_clusters=params['n_clusters'],
+            random_state=params['random_state'],
+            n_init=params['n_init'],
+            batch_size=min(self.chunk_rows, 10_000)
+        )
+        counts = np.zeros(params['n_clusters'])
+        for X, _, _, _ in self.chunks():
+            kmeans.partial_fit(cluster_scaler.transform(X[:, self.cluster_idx]))
+            counts += np.bincount(kmeans.labels_, minlength=params['n_clusters'])
+        return kmeans, counts
+
+    def train(self, n_jobs=-1):
+        """Fit every model from the stream and return the train_models() metrics"""
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.metrics import accuracy_score, mean_squared_error, r2_score
+        from cluster_assignment import ClusterAssigner
+
+        predictor = self.predictor
+        n_jobs = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+
+        print("\n🌊 Streaming training from", self.path)
+        print("=" * 60)
+
+        scaler, cluster_scaler, train_sample, test_sample = self._timed('scan', self._scan)
+        predictor.scaler = scaler
+        self.rows_seen = train_sample.rows_seen + test_sample.rows_seen
+        predictor.watermark = {'source': self.path, 'offset': self.rows_seen}
+        print(f"   ✓ Scanned {self.rows_seen:,} rows "
+              f"(train sample {len(train_sample.keys):,}, test sample {len(test_sample.keys):,})")
+
+        X_sample, _, y_risk_sample = train_sample.arrays()
+        X_test, y_impact_test, y_risk_test = test_sample.arrays()
+        X_sample_scaled = scaler.transform(pd.DataFrame(X_sample, columns=self.feature_cols))
+        X_test_scaled = scaler.transform(pd.DataFrame(X_test, columns=self.feature_cols))
+
+        print("\n1️⃣ Training XGBoost Regressor from the chunk iterator...")
+        predictor.xgb_model = self._timed('xgb_model', lambda: self._train_xgb(n_jobs))
+        y_pred_xgb = predictor.xgb_model.predict(pd.DataFrame(X_test, columns=self.feature_cols))
+        mse_xgb = mean_squared_error(y_impact_test, y_pred_xgb)
+        r2_xgb = r2_score(y_impact_test, y_pred_xgb)
+        print(f"   ✓ XGBoost MSE: {mse_xgb:.2f}, R² Score: {r2_xgb:.4f}")
+
+        print("\n2️⃣ Training Random Forest Classifier on the reservoir sample...")
+        predictor.rf_classifier = RandomForestClassifier(**predictor.MODEL_PARAMS['rf_classifier'], n_jobs=n_jobs)
+        self._timed('rf_classifier', lambda: predictor.rf_classifier.fit(X_sample_scaled, y_risk_sample))
+        predictor.rf_classifier.n_jobs = None  # serve single-threaded
+        acc_rf = accuracy_score(y_risk_test, predictor.rf_classifier.predict(X_test_scaled))
+        print(f"   ✓ Random Forest Accuracy: {acc_rf:.4f}")
+
+        print("\n3️⃣ Training Decision Tree on the reservoir sample...")
+        predictor.dt_classifier = DecisionTreeClassifier(**predictor.MODEL_PARAMS['dt_classifier'])
+        self._timed('dt_classifier', lambda: predictor.dt_classifier.fit(X_sample_scaled, y_risk_sample))
+        acc_dt = accuracy_score(y_risk_test, predictor.dt_classifier.predict(X_test_scaled))
+        print(f"   ✓ Decision Tree Accuracy: {acc_dt:.4f}")
+
+        print("\n4️⃣ Training Mini-Batch K-Means from chunks...")
+        predictor.kmeans_model, cluster_counts = self._timed('kmeans_model', lambda: self._train_kmeans(cluster_scaler))
+        predictor.cluster_assigner = ClusterAssigner.from_kmeans(
+            predictor.kmeans_model, cluster_scaler, predictor.CLUSTER_FEATURES, counts=cluster_counts
+        )
+        print(f"   ✓ K-Means trained with {predictor.kmeans_model.n_clusters} clusters")
+
+        print(f"\n✅ All models trained successfully! (peak RSS {_peak_rss_mb():.0f} MB)")
+
+        return {
+            'xgb_r2': r2_xgb,
+            'rf_accuracy': acc_rf,
+            'dt_accuracy': acc_dt
+        }
+
+
+def main():
+    """Train from a large CSV/Parquet history without loading it whole"""
+    from ml_models import PowerOutagePredictor
+    from model_registry import ModelRegistry
+
+    predictor = PowerOutagePredictor()
+    trainer = StreamingTrainer(
+        predictor,
+        os.getenv('TRAIN_DATA_PATH', 'chennai_power_outage_data.csv'),
+        chunk_rows=int(os.getenv('TRAIN_CHUNK_ROWS', '250000')),
+        sample_rows=int(os.getenv('TRAIN_SAMPLE_ROWS', '500000')),
+        external_memory=os.getenv('TRAIN_EXTERNAL_MEMORY', '0') == '1',
+        cache_dir=os.getenv('TRAIN_CACHE_DIR') or None
+    )
+    metrics = trainer.train()
+
+    print("\n⏱️ Stage timings:")
+    for stage, seconds in trainer.timings.items():
+        print(f"   {stage}: {seconds:.1f}s")
+
+    predictor.save_models()
+    ModelRegistry().publish(predictor, metrics, extra={'training_mode': 'streaming', 'rows': trainer.rows_seen})
+
+    print("\n🎉 Training complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+ElectroWizard - Training Pipeline Module
+Fits the independent models concurrently in worker processes with an
+explicit core budget per model, stages each artifact as soon as its model
+finishes, publishes the result as a registry version and reports wall
+time, CPU time and peak memory per model
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import joblib
+import numpy as np
+
+from cluster_assignment import ClusterAssigner
+
+# Default share of the core budget per model. The ensembles scale with
+# cores; a single tree and K-Means on four features barely do.
+CORE_WEIGHTS = {'xgb_model': 3, 'rf_classifier': 3, 'dt_classifier': 1, 'kmeans_model': 1}
+
+REPORT_FILE = 'training_report.json'
+
+
+def allocate_cores(total_cores, weights=CORE_WEIGHTS):
+    """Split total_cores across models by weight, at least one core each
+
+    The budgets never add up to more than total_cores. With fewer cores
+    than models every model gets one core, and train_concurrently() runs
+    only total_cores of them at a time.
+    """
+    if total_cores < len(weights):
+        return {name: 1 for name in weights}
+
+    total_weight = sum(weights.values())
+    budget = {name: max(1, int(total_cores * weight / total_weight)) for name, weight in weights.items()}
+
+    # The one-core floor can overshoot; take the excess back from the largest budgets
+    while sum(budget.values()) > total_cores:
+        budget[max(budget, key=budget.get)] -= 1
+
+    # Rounding leftovers go to the heaviest models first
+    leftover = total_cores - sum(budget.values())
+    for name in sorted(weights, key=weights.get, reverse=True):
+        if leftover <= 0:
+            break
+        budget[name] += 1
+        leftover -= 1
+    return budget
+
+
+def parse_core_budget(value):
+    """Parse 'xgb_model=4,rf_classifier=4,...' (the TRAIN_CORE_BUDGET format)"""
+    budget = {}
+    for item in value.split(','):
+        name, _, cores = item.partition('=')
+        if name.strip() not in CORE_WEIGHTS:
+            raise ValueError(f"Unknown model '{name.strip()}' in core budget")
+        budget[name.strip()] = max(1, int(cores))
+    return budget
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _fit_xgb_model(params, cores, data, feature_cols):
+    import pandas as pd
+    import xgboost as xgb
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    # Fit on a DataFrame so the booster keeps its feature names, as in train_models()
+    model = xgb.XGBRegressor(**params, n_jobs=cores)
+    model.fit(pd.DataFrame(data('X_train'), columns=feature_cols), data('y_impact_train'))
+
+    y_pred = model.predict(pd.DataFrame(data('X_test'), columns=feature_cols))
+    return model, {
+        'xgb_mse': mean_squared_error(data('y_impact_test'), y_pred),
+        'xgb_r2': r2_score(data('y_impact_test'), y_pred)
+    }
+
+
+def _fit_rf_classifier(params, cores, data, feature_cols):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+
+    model = RandomForestClassifier(**params, n_jobs=cores)
+    model.fit(data('X_train_scaled'), data('y_risk_train'))
+    model.n_jobs = None  # the fit's core budget is not the serving one
+    return model, {'rf_accuracy': accuracy_score(data('y_risk_test'), model.predict(data('X_test_scaled')))}
+
+
+def _fit_dt_classifier(params, cores, data, feature_cols):
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.metrics import accuracy_score
+
+    model = DecisionTreeClassifier(**params)
+    model.fit(data('X_train_scaled'), data('y_risk_train'))
+    return model, {'dt_accuracy': accuracy_score(data('y_risk_test'), model.predict(data('X_test_scaled')))}
+
+
+def _fit_kmeans_model(params, cores, data, feature_cols):
+    from sklearn.cluster import KMeans
+
+    model = KMeans(**params)
+    model.fit(data('cluster_features_scaled'))
+    return model, {'kmeans_inertia': model.inertia_}
+
+
+FITTERS = {
+    'xgb_model': _fit_xgb_model,
+    'rf_classifier': _fit_rf_classifier,
+    'dt_classifier': _fit_dt_classifier,
+    'kmeans_model': _fit_kmeans_model
+}
+
+
+def _train_one(name, params, cores, data_dir, feature_cols):
+    """Worker entry point: fit one model within its core budget"""
+    from threadpoolctl import threadpool_limits
+
+    start_wall = time.perf_counter()
+    start_cpu = _cpu_seconds()
+
+    def data(array_name):
+        return np.load(os.path.join(data_dir, f'{array_name}.npy'), mmap_mode='r')
+
+    # Caps OpenMP/BLAS pools too (K-Means, scaler maths) on top of n_jobs
+    with threadpool_limits(limits=cores):
+        model, metrics = FITTERS[name](params, cores, data, feature_cols)
+
+    return name, model, metrics, {
+        'cores': cores,
+        'wall_s': time.perf_counter() - start_wall,
+        'cpu_s': _cpu_seconds() - start_cpu,
+        'peak_rss_mb': _peak_rss_mb(),
+        'pid': os.getpid()
+    }
+
+
+def _write_training_data(predictor, df, data_dir):
+    """Split and scale once in the parent, then share the arrays via .npy files"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    X = df[predictor.feature_cols].astype(np.float64)
+    X_train, X_test, y_impact_train, y_impact_test, y_risk_train, y_risk_test = train_test_split(
+        X, df['impact_score'].to_numpy(), df['risk_encoded'].to_numpy(), test_size=0.2, random_state=42
+    )
+
+    # Fitted on the DataFrame so the scaler keeps feature names like train_models() does
+    predictor.scaler = StandardScaler()
+    X_train_scaled = predictor.scaler.fit_transform(X_train)
+    X_test_scaled = predictor.scaler.transform(X_test)
+    X_train, X_test = X_train.to_numpy(), X_test.to_numpy()
+
+    cluster_scaler = StandardScaler()
+    cluster_features_scaled = cluster_scaler.fit_transform(df[predictor.CLUSTER_FEATURES].to_numpy(dtype=np.float64))
+
+    arrays = {
+        'X_train': X_train, 'X_test': X_test,
+        'X_train_scaled': X_train_scaled, 'X_test_scaled': X_test_scaled,
+        'y_impact_train': y_impact_train, 'y_impact_test': y_impact_test,
+        'y_risk_train': y_risk_train, 'y_risk_test': y_risk_test,
+        'cluster_features_scaled': cluster_features_scaled
+    }
+    for array_name, array in arrays.items():
+        np.save(os.path.join(data_dir, f'{array_name}.npy'), array)
+
+    return cluster_scaler
+
+
+def train_concurrently(predictor, df, directory, core_budget=None, total_cores=None):
+    """Train every model of the predictor in parallel worker processes
+
+    Each model runs in its own spawned process (one task per process, so its
+    resource usage is its own) limited to core_budget[name] threads. Each
+    model is checkpointed to the staging `directory` as soon as its fit
+    completes. Never pass the live models/ directory: main() stages into the
+    new registry version, which stays invisible until publish() writes its
+    manifest, so a crash or a concurrent load never sees a mix of versions.
+
+    Returns (metrics, report).
+    """
+    pipeline_start = time.perf_counter()
+    total_cores = total_cores or os.cpu_count() or 1
+    core_budget = {**allocate_cores(total_cores), **(core_budget or {})}
+    os.makedirs(directory, exist_ok=True)
+
+    print("\n🤖 Training Machine Learning Models concurrently...")
+    print("=" * 60)
+    print(f"   Core budget ({total_cores} cores): " + ", ".join(f"{n}={c}" for n, c in core_budget.items()))
+
+    metrics = {}
+    models = {}
+    with tempfile.TemporaryDirectory(prefix='electrowizard-train-') as data_dir:
+        cluster_scaler = _write_training_data(predictor, df, data_dir)
+        prepare_s = time.perf_counter() - pipeline_start
+
+        # Heaviest models first so the long poles start immediately
+        order = sorted(core_budget, key=core_budget.get, reverse=True)
+        with ProcessPoolExecutor(
+            max_workers=min(len(order), total_cores),
+            mp_context=multiprocessing.get_context('spawn'),
+            max_tasks_per_child=1
+        ) as pool:
+            futures = [
+                pool.submit(_train_one, name, predictor.MODEL_PARAMS[name], core_budget[name], data_dir,
+                            list(predictor.feature_cols))
+                for name in order
+            ]
+            for future in as_completed(futures):
+                name, model, model_metrics, stats = future.result()
+                setattr(predictor, name, model)
+
+                path = os.path.join(directory, f'{name}.pkl')
+                joblib.dump(model, path)
+                stats['artifact'] = path
+                stats['finished_at_s'] = time.perf_counter() - pipeline_start
+
+                models[name] = stats
+                metrics.update(model_metrics)
+                print(f"   ✓ {name} done in {stats['wall_s']:.1f}s "
+                      f"({stats['cpu_s']:.1f}s CPU, {stats['peak_rss_mb']:.0f} MB peak) → {path}")
+
+    predictor.cluster_assigner = ClusterAssigner.from_kmeans(
+        predictor.kmeans_model, cluster_scaler, predictor.CLUSTER_FEATURES,
+        counts=np.bincount(predictor.kmeans_model.labels_, minlength=predictor.kmeans_model.n_clusters)
+    )
+
+    wall_s = time.perf_counter() - pipeline_start
+    report = {
+        'total_cores': total_cores,
+        'core_budget': core_budget,
+        'prepare_s': prepare_s,
+        'wall_s': wall_s,
+        'sequential_wall_s': sum(stats['wall_s'] for stats in models.values()),
+        'cpu_s': sum(stats['cpu_s'] for stats in models.values()),
+        'parent_peak_rss_mb': _peak_rss_mb(),
+        'models': models,
+        'metrics': {name: float(value) for name, value in metrics.items()}
+    }
+    with open(os.path.join(directory, REPORT_FILE), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n✅ All models trained successfully!")
+    return metrics, report
+
+
+def print_report(report):
+    print("\n⏱️ Training Report:")
+    print(f"   {'model':<15}{'cores':>6}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}")
+    for name, stats in report['models'].items():
+        print(f"   {name:<15}{stats['cores']:>6}{stats['wall_s']:>9.1f}{stats['cpu_s']:>9.1f}{stats['peak_rss_mb']:>9.0f}")
+    print(f"   Total wall time: {report['wall_s']:.1f}s "
+          f"(models back to back: {report['sequential_wall_s']:.1f}s, data prep: {report['prepare_s']:.1f}s)")
+
+
+def main():
+    """Nightly retrain: concurrent fit, report, save and publish a new version"""
+    from ml_models import PowerOutagePredictor
+    from model_registry import ModelRegistry
+
+    predictor = PowerOutagePredictor()
+    df = predictor.load_data(os.getenv('TRAIN_DATA_PATH', 'chennai_power_outage_data.csv'))
+
+    total_cores = int(os.getenv('TRAIN_CORES', '0')) or None
+    budget_spec = os.getenv('TRAIN_CORE_BUDGET')
+    core_budget = parse_core_budget(budget_spec) if budget_spec else None
+
+    # Stage into the new version's directory; publish() completes it (scalers,
+    # feature list, fast artifacts) and writes the manifest that makes it visible
+    registry = ModelRegistry()
+    version = registry.new_version()
+    metrics, report = train_concurrently(predictor, df, registry.version_dir(version),
+                                         core_budget=core_budget, total_cores=total_cores)
+    print_report(report)
+
+    print("\n📈 Model Performance Summary:")
+    print(f"   XGBoost R² Score: {metrics['xgb_r2']:.4f}")
+    print(f"   Random Forest Accuracy: {metrics['rf_accuracy']:.4f}")
+    print(f"   Decision Tree Accuracy: {metrics['dt_accuracy']:.4f}")
+
+    registry.publish(predictor, metrics, version=version, extra={'training_report': report})
+    if os.getenv('TRAIN_ACTIVATE', '0') == '1':
+        registry.set_current(version)
+
+    print("\n🎉 Training complete!")
+
+
+if __name__ == "__main__":
+    main()
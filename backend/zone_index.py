@@ -0,0 +1,115 @@
+"""
+ElectroWizard - Zone Index Module
+Secondary indexes over the zone dataset (zone_id, district, risk levels)
+so lookups cost O(result) instead of a full boolean-mask scan
+"""
+
+import copy
+import numpy as np
+import pandas as pd
+
+from cluster_assignment import ClusterIndex
+
+INDEXED_COLUMNS = ('zone_id', 'district', 'risk_level', 'model_risk_level')
+
+
+class LabelIndex:
+    """label -> row positions for one column
+
+    Labels are hashed to dense codes and the positions kept in a
+    ClusterIndex over those codes, so each slice is in dataset order and
+    changed rows can be applied with updated() without a rebuild.
+    """
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(values)
+        self._labels = pd.Index(uniques)
+
+        # Missing values (code -1) go to a trailing bucket that is never looked up
+        self._missing_code = len(self._labels)
+        self._index = ClusterIndex(np.where(codes < 0, self._missing_code, codes), self._missing_code + 1)
+
+    def updated(self, positions, values):
+        """A new index with the rows at positions now holding values, or None
+        when a value is a label this index has never seen (rebuild instead)"""
+        values = pd.Index(values)
+        codes = self._labels.get_indexer(values)
+        missing = np.asarray(values.isna())
+        if ((codes < 0) & ~missing).any():
+            return None
+
+        index = copy.copy(self)
+        index._index = self._index.updated(positions, np.where(missing, self._missing_code, codes))
+        return index
+
+    def _codes(self, labels):
+        codes = self._labels.get_indexer(pd.Index(labels))
+        return np.unique(codes[codes >= 0])
+
+    def positions(self, labels):
+        """Row positions holding any of labels, ascending (unknown labels are ignored)"""
+        codes = self._codes(labels)
+        if len(codes) == 1:
+            return self._index.positions(codes[0])
+        if len(codes) == 0:
+            return self._index.positions(-1)
+        return np.sort(np.concatenate([self._index.positions(c) for c in codes]))
+
+    def count(self, label):
+        codes = self._codes([label])
+        return self._index.size(codes[0]) if len(codes) else 0
+
+
+class ZoneIndex:
+    """Secondary indexes for the INDEXED_COLUMNS present in the dataset
+
+    Rebuild a column with refresh() when most of its values change (e.g.
+    model_risk_level after a full rescore), or apply a few changed rows
+    with update() so lookups stay consistent.
+    """
+
+    def __init__(self, df, columns=INDEXED_COLUMNS):
+        self._indexes = {}
+        self.refresh(df, columns)
+
+    def refresh(self, df, columns=INDEXED_COLUMNS):
+        for column in columns:
+            if column in df.columns:
+                self._indexes[column] = LabelIndex(df[column])
+
+    def refreshed(self, df, columns=INDEXED_COLUMNS):
+        """A new ZoneIndex with columns rebuilt from df, sharing the other indexes"""
+        index = copy.copy(self)
+        index._indexes = dict(self._indexes)
+        index.refresh(df, columns)
+        return index
+
+    def update(self, df, column, positions):
+        """Re-index the rows at positions after their column values changed
+
+        The column's index is replaced by a new object, so concurrent
+        lookups see either the old or the new state, never a mix.
+        """
+        if column not in self._indexes:
+            return
+        values = df[column].iloc[positions]
+        index = self._indexes[column].updated(positions, values)
+        self._indexes[column] = index if index is not None else LabelIndex(df[column])
+
+    def has(self, column):
+        return column in self._indexes
+
+    def positions(self, column, labels):
+        """Row positions where column is any of labels, in dataset order"""
+        return self._indexes[column].positions(labels)
+
+    def zone_positions(self, zone_ids):
+        return self.positions('zone_id', zone_ids)
+
+    def first(self, column, label):
+        """Position of the first row with this label, or None"""
+        positions = self._indexes[column].positions([label])
+        return int(positions[0]) if len(positions) else None
+
+    def count(self, column, label):
+        return self._indexes[column].count(label)
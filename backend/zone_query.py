@@ -0,0 +1,80 @@
+"""
+ElectroWizard - Zone Query Module
+Cursor pagination, field projection and chunked NDJSON encoding for the
+zone listing endpoints, so a response never has to hold the whole city
+"""
+
+import base64
+import json
+import os
+import numpy as np
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+STREAM_CHUNK_ROWS = int(os.getenv('ZONES_STREAM_CHUNK_ROWS', '1000'))
+
+# Always returned so every projected row can still be identified
+REQUIRED_FIELDS = ('zone_id',)
+
+
+def encode_cursor(position):
+    """Opaque cursor for 'rows after this dataset position'"""
+    payload = json.dumps({'after': int(position)}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))['after']
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    if not isinstance(after, int) or after < -1:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return after
+
+
+def page_positions(positions, n_rows, cursor=None, limit=None):
+    """Slice one page out of the matching row positions
+
+    positions are the ascending dataset positions that match the query, or
+    None for every row (no array is built for that case). The cursor is the
+    last position of the previous page, so pages stay stable while rows
+    are updated in place. Returns (page, total, next_cursor).
+    """
+    after = decode_cursor(cursor) if cursor else -1
+
+    if positions is None:
+        total = n_rows
+        start = after + 1
+        end = total if limit is None else min(total, start + limit)
+        page = np.arange(min(start, total), end)
+    else:
+        total = len(positions)
+        start = int(np.searchsorted(positions, after, side='right'))
+        end = total if limit is None else min(total, start + limit)
+        page = positions[start:end]
+
+    next_cursor = encode_cursor(page[-1]) if len(page) and end < total else None
+    return page, total, next_cursor
+
+
+def parse_fields(fields, columns):
+    """Validate a comma-separated fields= projection; None means every column"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}")
+    return list(dict.fromkeys([*REQUIRED_FIELDS, *requested]))
+
+
+def iter_ndjson(df, positions, to_records, chunk_rows=STREAM_CHUNK_ROWS):
+    """Encode df's rows at positions as NDJSON, one chunk of rows at a time
+
+    Only chunk_rows records exist at once, so memory stays bounded and the
+    first bytes go out before the rest are encoded.
+    """
+    for start in range(0, len(positions), chunk_rows):
+        records = to_records(df.iloc[positions[start:start + chunk_rows]])
+        yield ''.join(json.dumps(record) + '\n' for record in records)
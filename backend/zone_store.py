@@ -0,0 +1,170 @@
+"""
+ElectroWizard - Zone Store Module
+Columnar (Parquet/Feather) zone dataset with categorical and downcast
+integer dtypes, ingested once from the CSV with the weather encoding applied
+"""
+
+import os
+import sys
+import time
+import pandas as pd
+
+# The encoding the models were trained with (dataset_generator, ml_models)
+WEATHER_ENCODING = {'Clear': 0.0, 'Rain': 1.0, 'Storm': 2.0, 'Hot': 0.5}
+RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+
+CSV_PATH = 'chennai_power_outage_data.csv'
+STORE_PATH = os.getenv('ZONE_STORE_PATH', 'chennai_power_outage_data.parquet')
+
+# Fixed category sets; district categories come from the data
+CATEGORICAL_COLUMNS = {
+    'district': None,
+    'risk_level': RISK_LEVELS,
+    'weather_condition': list(WEATHER_ENCODING)
+}
+
+
+def encode_weather(df):
+    """Set weather_encoded from weather_condition (unknown conditions encode as Clear)"""
+    if 'weather_condition' in df.columns:
+        df['weather_encoded'] = df['weather_condition'].astype(object).map(WEATHER_ENCODING).fillna(0.0)
+    else:
+        df['weather_encoded'] = 0.0
+    return df
+
+
+def optimize_dtypes(df):
+    """Categoricals for the low-cardinality labels, smallest int types for counts
+
+    Floats stay float64: float32 would leak rounding noise into the JSON
+    responses (99.84 -> 99.83999633789062) and shift model inputs.
+    """
+    for column, categories in CATEGORICAL_COLUMNS.items():
+        if column in df.columns:
+            if categories is None:
+                categories = sorted(df[column].dropna().unique())
+            df[column] = pd.Categorical(df[column], categories=categories)
+
+    for column in df.select_dtypes(include='integer').columns:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def cast_like(values, dtype):
+    """Cast incoming values to a store column's dtype before assigning into it"""
+    return pd.Series(values).astype(dtype).to_numpy()
+
+
+def value_counts_dict(series):
+    """value_counts() as a plain dict without the zero rows categoricals add"""
+    counts = series.value_counts()
+    return {str(key): int(count) for key, count in counts.items() if count > 0}
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def _is_feather(path):
+    return path.endswith(('.arrow', '.feather'))
+
+
+def save_zone_store(df, path=STORE_PATH):
+    """Write the zone frame to Parquet or Feather (by extension), atomically"""
+    # Per-process temp name: several workers may rebuild a stale store at once
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if _is_feather(path):
+        df.reset_index(drop=True).to_feather(tmp_path)
+    else:
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def read_zone_store(path=STORE_PATH, columns=None):
+    if _is_feather(path):
+        return pd.read_feather(path, columns=columns)
+    return pd.read_parquet(path, columns=columns)
+
+
+def ingest_csv(csv_path=CSV_PATH, store_path=STORE_PATH):
+    """Read the CSV once, encode weather, optimize dtypes and write the store"""
+    df = optimize_dtypes(encode_weather(pd.read_csv(csv_path)))
+    if store_path:
+        save_zone_store(df, store_path)
+    return df
+
+
+def store_is_current(csv_path=CSV_PATH, store_path=STORE_PATH):
+    """True when the store exists and is at least as new as the CSV"""
+    if not os.path.exists(store_path):
+        return False
+    return not os.path.exists(csv_path) or os.path.getmtime(store_path) >= os.path.getmtime(csv_path)
+
+
+def load_zones(csv_path=CSV_PATH, store_path=STORE_PATH):
+    """Zone frame for the API: from the store, (re)built from the CSV when stale
+
+    Returns (df, info) or (None, info) when neither file exists.
+    """
+    start = time.perf_counter()
+    if store_is_current(csv_path, store_path):
+        df, source = read_zone_store(store_path), 'store'
+    elif os.path.exists(csv_path):
+        try:
+            df, source = ingest_csv(csv_path, store_path), 'csv'
+        except ImportError:
+            # No pyarrow: still serve the optimized frame, just without a store
+            df, source = ingest_csv(csv_path, None), 'csv'
+    else:
+        return None, {'source': None}
+
+    return df, {
+        'source': source,
+        'path': store_path if source == 'store' else csv_path,
+        'rows': len(df),
+        'load_ms': (time.perf_counter() - start) * 1000,
+        'memory_mb': memory_mb(df)
+    }
+
+
+def benchmark(csv_path=CSV_PATH, scales=(1, 10), work_dir='.'):
+    """Load time and memory of the raw CSV frame vs the Parquet and Feather stores"""
+    base = pd.read_csv(csv_path)
+    print("⏱️ Zone store benchmark")
+    print("=" * 60)
+    print(f"   {'rows':>10}  {'format':<8}{'load ms':>10}{'memory MB':>12}{'file MB':>10}")
+
+    for scale in scales:
+        df = pd.concat([base] * scale, ignore_index=True)
+        paths = {
+            'csv': os.path.join(work_dir, f'_bench_{scale}.csv'),
+            'parquet': os.path.join(work_dir, f'_bench_{scale}.parquet'),
+            'feather': os.path.join(work_dir, f'_bench_{scale}.arrow')
+        }
+        df.to_csv(paths['csv'], index=False)
+        optimized = optimize_dtypes(encode_weather(df.copy()))
+        save_zone_store(optimized, paths['parquet'])
+        save_zone_store(optimized, paths['feather'])
+
+        for name, path in paths.items():
+            start = time.perf_counter()
+            loaded = encode_weather(pd.read_csv(path)) if name == 'csv' else read_zone_store(path)
+            load_ms = (time.perf_counter() - start) * 1000
+            print(f"   {len(df):>10,}  {name:<8}{load_ms:>10.1f}{memory_mb(loaded):>12.2f}"
+                  f"{os.path.getsize(path) / 1e6:>10.2f}")
+            os.remove(path)
+
+
+def main():
+    """python zone_store.py [benchmark]: build the store from the CSV or compare formats"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        benchmark()
+        return
+
+    df = ingest_csv()
+    print(f"💾 Zone store written to {STORE_PATH}: {len(df):,} rows, {memory_mb(df):.2f} MB in memory")
+    print(df.dtypes.to_string())
+
+
+if __name__ == "__main__":
+    main()
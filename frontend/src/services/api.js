@@ -15,6 +15,23 @@ export const api = {
         return axios.get(`${API_BASE_URL}/zones/district/${district}`);
     },
 
+    // Get zones inside the visible map bounds
+    getZonesInBounds: (minLat, minLon, maxLat, maxLon, limit = 5000) => {
+        return axios.get(`${API_BASE_URL}/zones/bbox`, {
+            params: { min_lat: minLat, min_lon: minLon, max_lat: maxLat, max_lon: maxLon, limit }
+        });
+    },
+
+    // Get zones within a radius (km) of a point, nearest first
+    getZonesNear: (lat, lon, radiusKm = 2) => {
+        return axios.get(`${API_BASE_URL}/zones/near`, { params: { lat, lon, radius_km: radiusKm } });
+    },
+
+    // Get the k zones nearest to a point
+    getNearestZones: (lat, lon, k = 10) => {
+        return axios.get(`${API_BASE_URL}/zones/nearest`, { params: { lat, lon, k } });
+    },
+
     // Predict impact
     predictImpact: (features) => {
         return axios.post(`${API_BASE_URL}/predict`, features);